@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import User
+        from .signals import user_deleted, user_saved
+
+        post_save.connect(user_saved, sender=User, dispatch_uid='authentication.user_saved')
+        post_delete.connect(user_deleted, sender=User, dispatch_uid='authentication.user_deleted')
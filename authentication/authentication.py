@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.revocation import is_revoked
+from authentication.tokens import USER_CLAIM_FIELDS
+
+User = get_user_model()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds the user from the token's claims instead
+    of selecting it on every request. The other columns are deferred and
+    load on first access. Tokens whose `is_active`/`is_staff` claims no
+    longer match the user (deactivated, demoted or deleted since the token
+    was issued) are rejected through `authentication.revocation`.
+
+    Tokens without the claims (issued before they were added) fall back to
+    the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or any(field not in validated_token for field in USER_CLAIM_FIELDS):
+            return super().get_user(validated_token)
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError):
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        if is_revoked(user_id, validated_token['is_active'], validated_token['is_staff']):
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        claims = {field: validated_token[field] for field in USER_CLAIM_FIELDS}
+        claims[User._meta.pk.attname] = user_id
+        # from_db expects values in concrete field order; anything missing is deferred.
+        loaded = [field.attname for field in User._meta.concrete_fields if field.attname in claims]
+        return User.from_db(DEFAULT_DB_ALIAS, loaded, [claims[name] for name in loaded])
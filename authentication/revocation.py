@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from rest_framework_simplejwt.settings import api_settings
+
+# Recorded for deleted users: matches no token, since tokens are only issued
+# to active users.
+REVOKED = (False, False)
+
+
+def _key(user_id):
+    return f'auth:state:{user_id}'
+
+
+def get_cache():
+    return caches[settings.AUTH_REVOCATION_CACHE_ALIAS]
+
+
+def cache_is_shared():
+    """
+    Whether every worker sees the same markers. A per-process cache only
+    knows about changes made in this process, so lookups fall back to the
+    database instead.
+    """
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def _timeout():
+    if cache_is_shared():
+        # Markers only need to outlive the longest-lived access token; after
+        # that the tokens carrying the old flags have expired anyway.
+        return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    return settings.AUTH_REVOCATION_LOCAL_TTL
+
+
+def record_users(states):
+    """
+    Record the current `(is_active, is_staff)` of each user id in `states`.
+    Tokens whose claims differ from the recorded flags are rejected, so a
+    deactivated or demoted user has to log in again.
+    """
+    get_cache().set_many({_key(user_id): state for user_id, state in states.items()}, _timeout())
+
+
+def revoke_users(user_ids):
+    record_users({user_id: REVOKED for user_id in user_ids})
+
+
+def current_state(user_id):
+    """
+    The recorded `(is_active, is_staff)` of a user, or None when nothing has
+    changed since its tokens were issued. Without a shared cache the flags
+    are read from the database and kept for AUTH_REVOCATION_LOCAL_TTL seconds.
+    """
+    cache = get_cache()
+    state = cache.get(_key(user_id))
+    if state is None and not cache_is_shared():
+        row = get_user_model().objects.filter(pk=user_id).values_list('is_active', 'is_staff').first()
+        state = tuple(row) if row else REVOKED
+        cache.set(_key(user_id), state, settings.AUTH_REVOCATION_LOCAL_TTL)
+    return None if state is None else tuple(state)
+
+
+def is_revoked(user_id, is_active, is_staff):
+    if not is_active:
+        return True
+    state = current_state(user_id)
+    return state is not None and state != (is_active, is_staff)
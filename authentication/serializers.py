@@ -24,7 +24,10 @@ class LoginSerializer(serializers.Serializer):
 
     def validate(self, data):
         user = User.objects.filter(email=data['email']).first()
-        if user and user.check_password(data['password']):
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            User().set_password(data['password'])
+        elif user.check_password(data['password']):
             if not user.is_active:
                 raise serializers.ValidationError("User is inactive.")
             return user
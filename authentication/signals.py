@@ -0,0 +1,14 @@
+from authentication.revocation import record_users, revoke_users
+
+TOKEN_FLAGS = ('is_active', 'is_staff')
+
+
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Queryset .update() bypasses this; call record_users() after bulk changes.
+    if created or (update_fields is not None and not set(TOKEN_FLAGS) & set(update_fields)):
+        return
+    record_users({instance.pk: (instance.is_active, instance.is_staff)})
+
+
+def user_deleted(sender, instance, **kwargs):
+    revoke_users([instance.pk])
@@ -1,3 +1,189 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from .tokens import ClaimsRefreshToken
+
+try:
+    import argon2
+except ImportError:
+    argon2 = None
+
+User = get_user_model()
+
+
+class ClaimsJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Behave as with REDIS_URL set; LocalRevocationTest covers the fallback.
+        patcher = mock.patch('authentication.revocation.cache_is_shared', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+
+    def authorize(self, token_class=ClaimsRefreshToken):
+        token = token_class.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        return response, [q['sql'] for q in queries.captured_queries if '"authentication_user"' in q['sql']]
+
+    def test_login_token_carries_user_claims(self):
+        response = self.client.post('/auth/login/', {'email': 'test@example.com', 'password': 'testpass123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response, user_queries = self.user_queries('/products/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, [])
+
+    def test_user_is_built_from_claims_and_loads_the_rest_on_demand(self):
+        self.authorize()
+        response, _ = self.user_queries('/carts/detail/')
+        user = response.wsgi_request.user
+        self.assertEqual((user.pk, user.email, user.is_staff), (self.user.pk, self.user.email, False))
+        self.assertEqual(user.get_deferred_fields(), {'password', 'last_login', 'is_superuser'})
+        self.assertFalse(user.is_superuser)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authorize()
+        self.assertEqual(self.client.get('/products/products/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/products/products/').status_code, 401)
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.get('/products/products/').status_code, 200)
+
+    def test_deleted_user_is_rejected(self):
+        self.authorize()
+        self.user.delete()
+        self.assertEqual(self.client.get('/products/products/').status_code, 401)
+
+    def test_promoted_or_demoted_user_must_log_in_again(self):
+        self.authorize()
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        self.assertEqual(self.client.get('/products/products/').status_code, 401)
+        self.authorize()
+        self.assertEqual(self.client.get('/products/products/').status_code, 200)
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get('/products/products/').status_code, 401)
+
+    def test_unrelated_saves_keep_tokens_valid(self):
+        self.authorize()
+        self.user.first_name = 'Ada'
+        self.user.save()
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get('/products/products/').status_code, 200)
+
+    def test_tokens_without_claims_fall_back_to_lookup(self):
+        self.authorize(token_class=RefreshToken)
+        response, user_queries = self.user_queries('/products/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(user_queries), 1)
+
+
+class LocalRevocationTest(TestCase):
+    """Without a shared cache, flag changes made elsewhere are read from the database."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123', is_staff=True)
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_flags_are_read_from_the_database_once_per_ttl(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/products/products/').status_code, 200)
+            self.assertEqual(self.client.get('/products/products/').status_code, 200)
+        self.assertEqual(len([q for q in queries.captured_queries if '"authentication_user"' in q['sql']]), 1)
+
+    def test_demotion_by_another_worker_is_seen_after_the_ttl(self):
+        self.assertEqual(self.client.get('/products/products/').status_code, 200)
+        # Bypasses the signal, as a change made in another process would.
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        self.assertEqual(self.client.get('/products/products/').status_code, 200)
+        cache.clear()
+        self.assertEqual(self.client.get('/products/products/').status_code, 401)
+
+
+class LoginHardeningTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+
+    def login(self, email='test@example.com', password='testpass123', **extra):
+        return self.client.post('/auth/login/', {'email': email, 'password': password}, format='json', **extra)
+
+    def test_unknown_email_still_hashes_the_password(self):
+        with mock.patch.object(User, 'set_password', autospec=True) as set_password:
+            response = self.login(email='nobody@example.com')
+        self.assertEqual(response.status_code, 400)
+        set_password.assert_called_once()
+
+    @skipUnless(argon2, 'argon2-cffi is not installed')
+    def test_login_rehashes_with_preferred_hasher(self):
+        with override_settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.Argon2PasswordHasher',
+            'authentication.hashers.TunablePBKDF2PasswordHasher',
+        ]):
+            self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+        self.assertTrue(self.user.check_password('testpass123'))
+
+    @override_settings(PBKDF2_ITERATIONS=1000)
+    def test_login_rehashes_when_pbkdf2_iterations_change(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTest(TestCase):
+    """
+    The throttle clock is frozen so the windows cannot roll over mid-test,
+    and a fast hasher keeps the many logins cheap.
+    """
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(SimpleRateThrottle, 'timer', return_value=1_000_000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+
+    def login(self, email='test@example.com', password='testpass123', **extra):
+        return self.client.post('/auth/login/', {'email': email, 'password': password}, format='json', **extra)
+
+    def test_login_is_throttled_per_email(self):
+        for i in range(5):
+            self.assertEqual(self.login(password='wrong', REMOTE_ADDR=f'10.0.0.{i}').status_code, 400)
+        self.assertEqual(self.login(REMOTE_ADDR='10.0.0.99').status_code, 429)
+        self.assertEqual(self.login(email='other@example.com', REMOTE_ADDR='10.0.0.99').status_code, 400)
+
+    def test_login_is_throttled_per_ip(self):
+        for i in range(20):
+            self.login(email=f'user{i}@example.com')
+        self.assertEqual(self.login().status_code, 429)
+        self.assertEqual(self.login(REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+    def test_signup_is_throttled_per_ip(self):
+        for i in range(10):
+            response = self.client.post('/auth/signup/', {'email': f'new{i}@example.com', 'password': 'x'}, format='json')
+            self.assertEqual(response.status_code, 201)
+        response = self.client.post('/auth/signup/', {'email': 'one-more@example.com', 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, 429)
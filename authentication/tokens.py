@@ -0,0 +1,14 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# User fields copied into every token so authentication can rebuild the user
+# without a query (see ClaimsJWTAuthentication).
+USER_CLAIM_FIELDS = ('email', 'is_active', 'is_staff')
+
+
+class ClaimsRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in USER_CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
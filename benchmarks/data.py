@@ -0,0 +1,122 @@
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from carts.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from orders.services import build_order_items, cart_snapshot_rows
+from products.models.product_models import Products
+
+User = get_user_model()
+
+BENCH_EMAIL_DOMAIN = 'bench.mini-store.local'
+SHOPPER_PREFIX = 'shopper-'
+
+
+def shoppers():
+    return User.objects.filter(email__startswith=SHOPPER_PREFIX, email__endswith=BENCH_EMAIL_DOMAIN)
+
+
+def get_bench_user():
+    user, _ = User.objects.get_or_create(email=f'seller@{BENCH_EMAIL_DOMAIN}')
+    return user
+
+
+def seed_products(count, batch_size=5000, owner=None):
+    """Top the catalog up to at least `count` benchmark products."""
+    owner = owner or get_bench_user()
+    existing = Products.objects.filter(name__startswith='bench-product-').count()
+    for start in range(existing, count, batch_size):
+        Products.objects.bulk_create(
+            [
+                Products(
+                    name=f'bench-product-{i:08d}',
+                    description=f'Benchmark product number {i}',
+                    quantity=i % 500,
+                    price=Decimal(i % 10000) / 100 + 1,
+                    created_by=owner,
+                )
+                for i in range(start, min(start + batch_size, count))
+            ],
+            batch_size=batch_size,
+        )
+    return owner
+
+
+def seed_users(count, batch_size=5000):
+    """Top the benchmark shoppers up to at least `count` users."""
+    existing = shoppers().count()
+    password = make_password(None)
+    for start in range(existing, count, batch_size):
+        User.objects.bulk_create(
+            [
+                User(email=f'{SHOPPER_PREFIX}{i:08d}@{BENCH_EMAIL_DOMAIN}', password=password)
+                for i in range(start, min(start + batch_size, count))
+            ],
+            batch_size=batch_size,
+        )
+
+
+def _cycle_product_ids(batch_size):
+    while True:
+        empty = True
+        for product_id in Products.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size):
+            empty = False
+            yield product_id
+        if empty:
+            return
+
+
+def seed_cart_lines(count, batch_size=5000):
+    """
+    Give every benchmark shopper one cart and spread `count` cart lines over
+    those carts round-robin, walking the catalog in primary-key order. The
+    catalog is streamed, so only one batch of product ids is in memory.
+    """
+    without_cart = shoppers().filter(carts__isnull=True)
+    while True:
+        user_ids = list(without_cart.values_list('pk', flat=True)[:batch_size])
+        if not user_ids:
+            break
+        Cart.objects.bulk_create([Cart(user_id=user_id) for user_id in user_ids], batch_size=batch_size)
+    carts = Cart.objects.filter(user__in=shoppers(), order__isnull=True)
+    cart_ids = list(carts.order_by('pk').values_list('pk', flat=True))
+    existing = CartItem.objects.filter(cart__in=carts).count()
+    if not cart_ids or existing >= count:
+        return
+    product_ids = _cycle_product_ids(batch_size)
+    for start in range(existing, count, batch_size):
+        stop = min(start + batch_size, count)
+        CartItem.objects.bulk_create(
+            [
+                CartItem(cart_id=cart_ids[i % len(cart_ids)], product_id=product_id, quantity=1 + i % 3)
+                for i, product_id in zip(range(start, stop), islice(product_ids, stop - start))
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+
+def seed_dataset(products, users, cart_lines, batch_size=5000):
+    owner = seed_products(products, batch_size=batch_size)
+    seed_users(users, batch_size=batch_size)
+    seed_cart_lines(cart_lines, batch_size=batch_size)
+    return owner
+
+
+def seed_cart_and_order(user, lines=10):
+    """Give `user` a cart with `lines` products and an order for it."""
+    if Order.objects.filter(cart__user=user).exists():
+        return
+    cart = Cart.objects.create(user=user)
+    CartItem.objects.bulk_create(
+        [
+            CartItem(cart=cart, product_id=product_id, quantity=1)
+            for product_id in Products.objects.values_list('product_id', flat=True)[:lines]
+        ]
+    )
+    items, totals = build_order_items(cart_snapshot_rows([cart.cart_id]))
+    Order.objects.create(cart=cart, total_amount=totals[cart.cart_id])
+    OrderItem.objects.bulk_create(items)
@@ -0,0 +1,53 @@
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.timing import summarize
+
+
+def _worker(base_url, path, headers, count, start_barrier):
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    latencies, errors = [], 0
+    start_barrier.wait()
+    for _ in range(count):
+        begin = time.perf_counter()
+        try:
+            connection.request('GET', parts.path.rstrip('/') + path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+        latencies.append(time.perf_counter() - begin)
+    connection.close()
+    return latencies, errors
+
+
+def run_load(base_url, path, token, concurrency, requests_per_worker):
+    """
+    Hit `base_url + path` from `concurrency` keep-alive connections, each
+    sending `requests_per_worker` sequential GETs, and summarize the run.
+    """
+    headers = {'Authorization': f'Bearer {token}', 'Connection': 'keep-alive'}
+    barrier = threading.Barrier(concurrency + 1)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_worker, base_url, path, headers, requests_per_worker, barrier)
+            for _ in range(concurrency)
+        ]
+        barrier.wait()
+        started = time.perf_counter()
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+    latencies = [latency for worker_latencies, _ in results for latency in worker_latencies]
+    summary = summarize(latencies, elapsed)
+    summary['errors'] = sum(errors for _, errors in results)
+    summary['concurrency'] = concurrency
+    return summary
@@ -0,0 +1,62 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from authentication.serializers import LoginSerializer
+from benchmarks.data import BENCH_EMAIL_DOMAIN
+from benchmarks.timing import run_timed
+
+User = get_user_model()
+
+PASSWORD = 'bench-password-123'
+
+
+def hasher_settings(name, pbkdf2_iterations=None):
+    preferred = settings.PASSWORD_HASHER_CHOICES[name]
+    overrides = {'PASSWORD_HASHERS': [preferred, *(h for h in settings.PASSWORD_HASHERS if h != preferred)]}
+    if pbkdf2_iterations:
+        overrides['PBKDF2_ITERATIONS'] = pbkdf2_iterations
+    return override_settings(**overrides)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure logins per second on one core (LoginSerializer: user lookup plus password check) "
+        "for each password hasher, plus the cost of rejecting an unknown email."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help="Logins timed per hasher setting.")
+        parser.add_argument(
+            '--pbkdf2-iterations', type=int, nargs='*', default=[],
+            help="Extra PBKDF2 iteration counts to compare with the default.",
+        )
+
+    def handle(self, *args, **options):
+        runs = [('pbkdf2', None)]
+        runs += [('pbkdf2', iterations) for iterations in options['pbkdf2_iterations']]
+        runs += [('argon2', None), ('bcrypt', None)]
+
+        user, _ = User.objects.get_or_create(email=f'login@{BENCH_EMAIL_DOMAIN}')
+        report = {}
+        for name, iterations in runs:
+            label = f'{name}_{iterations}' if iterations else name
+            with hasher_settings(name, iterations):
+                try:
+                    user.set_password(PASSWORD)
+                except ValueError as exc:
+                    # The hasher's library is not installed.
+                    report[label] = {'unavailable': str(exc)}
+                    continue
+                user.save(update_fields=['password'])
+                report[label] = {
+                    'login': run_timed(lambda i: self.login(user.email), options['logins']),
+                    'unknown_email': run_timed(lambda i: self.login(f'nobody@{BENCH_EMAIL_DOMAIN}'), options['logins']),
+                }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def login(self, email):
+        LoginSerializer(data={'email': email, 'password': PASSWORD}).is_valid()
@@ -0,0 +1,48 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from benchmarks.data import seed_products
+from benchmarks.timing import run_timed
+from products.models.product_models import Products
+from products.services import cache_services
+
+
+class Command(BaseCommand):
+    help = "Measure product detail/list read throughput with the product cache on and off."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000, help="Catalog size to seed before measuring.")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per endpoint and cache mode.")
+        parser.add_argument('--hot-set', type=int, default=100, help="Distinct products read by the detail scenario.")
+
+    def handle(self, *args, **options):
+        owner = seed_products(options['products'])
+        client = APIClient()
+        client.force_authenticate(user=owner)
+        product_ids = list(
+            Products.objects.values_list('product_id', flat=True)[:options['hot_set']]
+        )
+        scenarios = {
+            'detail': lambda i: client.get(f'/products/products/{product_ids[i % len(product_ids)]}/'),
+            'list': lambda i: client.get('/products/products/', {'page_size': 50}),
+        }
+
+        report = {}
+        for enabled in (False, True):
+            mode = 'cache_on' if enabled else 'cache_off'
+            with override_settings(PRODUCT_CACHE_ENABLED=enabled):
+                cache.clear()
+                cache_services.stats.reset()
+                report[mode] = {
+                    name: run_timed(call, options['requests'])
+                    for name, call in scenarios.items()
+                }
+                report[mode]['cache_stats'] = {
+                    f'{kind}_{outcome}': count
+                    for (kind, outcome), count in cache_services.stats.snapshot().items()
+                }
+        self.stdout.write(json.dumps(report, indent=2))
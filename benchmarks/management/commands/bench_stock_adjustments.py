@@ -0,0 +1,57 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+
+from benchmarks.data import seed_products
+from benchmarks.timing import run_timed
+from products.models.product_models import Products
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure stock adjustments per second through the batch inventory endpoint "
+        "against one full product PUT per adjustment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=5000, help="Catalog size to seed before measuring.")
+        parser.add_argument('--adjustments', type=int, default=20000, help="Adjustments applied through the batch endpoint.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--puts', type=int, default=500, help="Adjustments applied one PUT at a time.")
+
+    def handle(self, *args, **options):
+        owner = seed_products(options['products'])
+        owner.is_staff = True
+        client = APIClient()
+        client.force_authenticate(user=owner)
+        products = list(Products.objects.filter(created_by=owner).values('product_id', 'name', 'price', 'quantity')[:options['products']])
+        batch_size = options['batch_size']
+        # A fresh feed per run, so earlier runs' sequence numbers do not turn
+        # these batches into duplicates.
+        feed = f'bench-{time.time_ns()}'
+
+        def post_batch(i):
+            adjustments = [
+                {'product_id': str(products[(i * batch_size + j) % len(products)]['product_id']), 'delta': 1 if j % 2 else -1}
+                for j in range(batch_size)
+            ]
+            response = client.post(
+                '/products/inventory/adjustments/',
+                {'feed': feed, 'sequence': i, 'adjustments': adjustments},
+                format='json',
+            )
+            assert response.status_code == 200, response.content
+
+        def put_product(i):
+            product = products[i % len(products)]
+            data = {**product, 'product_id': None, 'quantity': product['quantity'] + i % 2}
+            response = client.put(f"/products/products/{product['product_id']}/update/", data, format='json')
+            assert response.status_code == 200, response.content
+
+        batches = max(1, options['adjustments'] // batch_size)
+        report = {'batch': run_timed(post_batch, batches), 'put': run_timed(put_product, options['puts'])}
+        report['batch']['adjustments_per_sec'] = round(report['batch']['req_per_sec'] * batch_size, 2)
+        report['put']['adjustments_per_sec'] = report['put']['req_per_sec']
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.tokens import ClaimsRefreshToken
+from benchmarks.data import seed_products, seed_cart_and_order
+from benchmarks.loadtest import run_load
+from products.models.product_models import Products
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test running servers and compare sync (WSGI) and async (ASGI) "
+        "throughput and latency percentiles at several concurrency levels. "
+        "Start both servers against the same database first, e.g. "
+        "`SERVER_MODE=wsgi GUNICORN_BIND=127.0.0.1:8000 gunicorn -c gunicorn.conf.py` and "
+        "`SERVER_MODE=asgi GUNICORN_BIND=127.0.0.1:8001 gunicorn -c gunicorn.conf.py`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', help="Base URL of the WSGI (sync workers) server.")
+        parser.add_argument('--asgi-url', help="Base URL of the ASGI (uvicorn workers) server.")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+        parser.add_argument('--requests', type=int, default=100, help="Requests per connection.")
+        parser.add_argument('--products', type=int, default=10000, help="Catalog size to seed first.")
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        targets = {
+            mode: url for mode, url in (('wsgi', options['wsgi_url']), ('asgi', options['asgi_url'])) if url
+        }
+        if not targets:
+            raise CommandError("Pass --wsgi-url and/or --asgi-url.")
+
+        owner = seed_products(options['products'])
+        seed_cart_and_order(owner)
+        token = str(ClaimsRefreshToken.for_user(owner).access_token)
+        product_id = Products.objects.values_list('product_id', flat=True).first()
+        endpoints = {
+            'product-list': {'wsgi': '/products/products/', 'asgi': '/products/async/products/'},
+            'product-detail': {
+                'wsgi': f'/products/products/{product_id}/',
+                'asgi': f'/products/async/products/{product_id}/',
+            },
+            'cart-detail': {'wsgi': '/carts/detail/', 'asgi': '/carts/async/detail/'},
+            'order-list': {'wsgi': '/orders/list/', 'asgi': '/orders/async/list/'},
+        }
+
+        report = {}
+        for mode, base_url in targets.items():
+            report[mode] = {}
+            for name, paths in endpoints.items():
+                report[mode][name] = [
+                    run_load(base_url, paths[mode], token, concurrency, options['requests'])
+                    for concurrency in options['concurrency']
+                ]
+                for row in report[mode][name]:
+                    self.stdout.write(
+                        f"{mode:4} {name:15} c={row['concurrency']:<4} "
+                        f"{row['req_per_sec']:>9} req/s  p99 {row['p99_ms']:>9} ms  errors {row['errors']}"
+                    )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        else:
+            self.stdout.write(output)
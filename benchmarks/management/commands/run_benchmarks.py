@@ -0,0 +1,96 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.scenarios import SCENARIOS, run_scenario
+from carts.models import CartItem
+from products.models.product_models import Products
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(report, baseline, tolerance):
+    regressions = []
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['queries_per_request'] > previous['queries_per_request']:
+            regressions.append(
+                f"{name}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}"
+            )
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['req_per_sec'] < previous['req_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: req/s {previous['req_per_sec']} -> {current['req_per_sec']}")
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the browse -> cart -> order -> pay benchmark scenarios in-process and "
+        "write req/s, latency percentiles and queries per request as JSON. "
+        "Seed data first with `seed_benchmark_data`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+        parser.add_argument('--iterations', type=int, default=300)
+        parser.add_argument('--warmup', type=int, default=30)
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--baseline', help="Earlier JSON report to compare against.")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.15,
+            help="Allowed relative p95/throughput change before it counts as a regression.",
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'started_at': datetime.now(timezone.utc).isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'products': Products.objects.count(),
+                'cart_lines': CartItem.objects.count(),
+                'iterations': options['iterations'],
+            },
+            'scenarios': {},
+        }
+        for name in options['scenarios']:
+            result = run_scenario(SCENARIOS[name](), options['iterations'], options['warmup'])
+            report['scenarios'][name] = result
+            self.stdout.write(
+                f"{name:12} {result['req_per_sec']:>9} req/s  p50 {result['p50_ms']}ms  "
+                f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  "
+                f"{result['queries_per_request']} queries/req  errors {result['errors']}"
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            with open(options['baseline']) as handle:
+                regressions = find_regressions(report, json.load(handle), options['tolerance'])
+            if regressions:
+                raise CommandError("Performance regressions:\n" + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
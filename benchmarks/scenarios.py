@@ -0,0 +1,184 @@
+import time
+
+from rest_framework.test import APIClient
+
+from authentication.tokens import ClaimsRefreshToken
+from benchmarks.data import get_bench_user, shoppers
+from benchmarks.timing import summarize
+from carts.models import Cart, CartItem
+from carts.services import get_cart_totals
+from products.models.product_models import Products
+from products.services.cache_services import invalidate_products
+
+# Stock given to the products a write scenario uses, so no run sells out.
+BENCH_STOCK = 10 ** 8
+
+
+class Scenario:
+    """
+    One benchmarked API call. `prepare(i)` runs untimed before each
+    iteration and `request(i)` is the timed call; both run in-process through
+    the full middleware and JWT authentication stack. `teardown()` undoes
+    what the run wrote, so every run measures the same data.
+    """
+    name = None
+
+    def __init__(self):
+        self.client = APIClient()
+
+    def authenticate(self, user):
+        self.user = user
+        token = ClaimsRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def setup(self):
+        self.authenticate(shoppers().first() or get_bench_user())
+
+    def prepare(self, i):
+        pass
+
+    def request(self, i):
+        raise NotImplementedError
+
+    def teardown(self):
+        pass
+
+    def stock_up(self, product_ids):
+        """Give `product_ids` plenty of stock until teardown restores it."""
+        self.saved_stock = dict(Products.objects.filter(pk__in=product_ids).values_list('pk', 'quantity'))
+        Products.objects.filter(pk__in=product_ids).update(quantity=BENCH_STOCK)
+
+    def restore_stock(self):
+        Products.objects.bulk_update(
+            [Products(pk=pk, quantity=quantity) for pk, quantity in self.saved_stock.items()], ['quantity']
+        )
+        invalidate_products(self.saved_stock)
+
+
+class BrowseScenario(Scenario):
+    name = 'browse'
+
+    def setup(self):
+        super().setup()
+        self.product_ids = list(Products.objects.values_list('product_id', flat=True)[:200])
+        self.next_page = None
+
+    def request(self, i):
+        step = i % 3
+        if step == 0:
+            response = self.client.get('/products/products/', {'page_size': 50})
+            self.next_page = response.data['next']
+            return response
+        if step == 1 and self.next_page:
+            return self.client.get(self.next_page)
+        return self.client.get(f'/products/products/{self.product_ids[i % len(self.product_ids)]}/')
+
+
+class AddToCartScenario(Scenario):
+    name = 'add_to_cart'
+
+    def setup(self):
+        super().setup()
+        self.product_ids = list(Products.objects.values_list('product_id', flat=True)[:500])
+        self.stock_up(self.product_ids)
+        self.carts = set(Cart.objects.filter(user=self.user).values_list('pk', flat=True))
+        self.lines = dict(CartItem.objects.filter(cart__user=self.user).values_list('pk', 'quantity'))
+
+    def request(self, i):
+        return self.client.post(
+            '/carts/add/',
+            {'product_id': str(self.product_ids[i % len(self.product_ids)]), 'quantity': 1},
+            format='json',
+        )
+
+    def teardown(self):
+        CartItem.objects.filter(cart__user=self.user).exclude(pk__in=self.lines).delete()
+        CartItem.objects.bulk_update(
+            [CartItem(pk=pk, quantity=quantity) for pk, quantity in self.lines.items()], ['quantity']
+        )
+        Cart.objects.filter(user=self.user).exclude(pk__in=self.carts).delete()
+        self.restore_stock()
+
+
+class AddSameLineScenario(AddToCartScenario):
+    """Repeated adds to one cart line: the upsert's increment path."""
+    name = 'add_same_line'
+
+    def setup(self):
+        super().setup()
+        self.product_ids = self.product_ids[:1]
+
+
+class CheckoutScenario(Scenario):
+    name = 'checkout'
+    lines = 5
+
+    def setup(self):
+        super().setup()
+        self.product_ids = list(Products.objects.values_list('product_id', flat=True)[:self.lines])
+        self.stock_up(self.product_ids)
+        self.created_carts = []
+
+    def prepare(self, i):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.bulk_create([CartItem(cart=cart, product_id=pk, quantity=1) for pk in self.product_ids])
+        self.created_carts.append(cart.pk)
+        self.cart = cart
+
+    def request(self, i):
+        return self.client.post('/orders/create/', {'input_cart_id': str(self.cart.cart_id)}, format='json')
+
+    def teardown(self):
+        # Orders, order items and payments go with their carts.
+        Cart.objects.filter(pk__in=self.created_carts).delete()
+        self.restore_stock()
+
+
+class PaymentScenario(CheckoutScenario):
+    """Queueing a payment as a client does; the worker settles it later."""
+    name = 'payment'
+
+    def prepare(self, i):
+        super().prepare(i)
+        self.amount = get_cart_totals(self.cart.cart_id).total
+
+    def request(self, i):
+        return self.client.post(
+            '/payments/create/',
+            {'cart_id': str(self.cart.cart_id), 'amount': str(self.amount)},
+            format='json',
+        )
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    BrowseScenario, AddToCartScenario, AddSameLineScenario, CheckoutScenario, PaymentScenario,
+)}
+
+
+def run_scenario(scenario, iterations, warmup=0):
+    scenario.setup()
+    try:
+        for i in range(warmup):
+            scenario.prepare(i)
+            scenario.request(i)
+
+        latencies, queries, errors = [], [], 0
+        elapsed = 0.0
+        for i in range(warmup, warmup + iterations):
+            scenario.prepare(i)
+            begin = time.perf_counter()
+            response = scenario.request(i)
+            latency = time.perf_counter() - begin
+            elapsed += latency
+            latencies.append(latency)
+            queries.append(response.wsgi_request.metrics_sample.queries)
+            if response.status_code >= 400:
+                errors += 1
+    finally:
+        scenario.teardown()
+
+    result = summarize(latencies, elapsed)
+    result['errors'] = errors
+    result['queries_per_request'] = round(sum(queries) / len(queries), 2) if queries else 0.0
+    result['max_queries'] = max(queries, default=0)
+    return result
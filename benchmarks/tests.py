@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from carts.models import Cart, CartItem
+from orders.models import Order
+from payments.models import Payment
+from products.models.product_models import Products
+
+from .data import seed_dataset, shoppers
+from .management.commands.run_benchmarks import find_regressions
+from .scenarios import SCENARIOS, run_scenario
+
+
+class SeedDatasetTest(TestCase):
+    def test_seed_is_idempotent_top_up(self):
+        seed_dataset(products=30, users=4, cart_lines=20, batch_size=7)
+        seed_dataset(products=30, users=4, cart_lines=20, batch_size=7)
+        self.assertEqual(Products.objects.count(), 30)
+        self.assertEqual(shoppers().count(), 4)
+        self.assertEqual(Cart.objects.count(), 4)
+        self.assertEqual(CartItem.objects.count(), 20)
+
+
+class ScenarioTest(TestCase):
+    def setUp(self):
+        seed_dataset(products=20, users=2, cart_lines=4)
+
+    def test_scenarios_run_without_errors(self):
+        for name, scenario in SCENARIOS.items():
+            with self.subTest(scenario=name):
+                result = run_scenario(scenario(), iterations=3, warmup=1)
+                self.assertEqual(result['errors'], 0)
+                self.assertEqual(result['requests'], 3)
+                self.assertGreater(result['queries_per_request'], 0)
+
+    def test_runs_leave_the_data_as_they_found_it(self):
+        def state():
+            return (
+                sorted(Products.objects.values_list('pk', 'quantity')),
+                sorted(CartItem.objects.values_list('pk', 'quantity')),
+                Cart.objects.count(), Order.objects.count(), Payment.objects.count(),
+            )
+
+        before = state()
+        for name, scenario in SCENARIOS.items():
+            with self.subTest(scenario=name):
+                run_scenario(scenario(), iterations=3, warmup=1)
+                self.assertEqual(state(), before)
+
+    def test_regression_detection(self):
+        baseline = {'scenarios': {'browse': {'queries_per_request': 2, 'p95_ms': 10, 'req_per_sec': 100}}}
+        report = {'scenarios': {'browse': {'queries_per_request': 3, 'p95_ms': 10.5, 'req_per_sec': 60}}}
+        regressions = find_regressions(report, baseline, tolerance=0.15)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('queries/request', regressions[0])
+        self.assertIn('req/s', regressions[1])
@@ -0,0 +1,62 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from carts.services import purge_stale_carts
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete carts (and their items) older than --ttl-days that have no order, no payment "
+        "and no recently added item, one primary-key window per transaction. Runs once unless "
+        "--loop is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl-days', type=float, default=None, help="Defaults to CART_TTL_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Carts examined per transaction.")
+        parser.add_argument('--archive', help="Append each removed cart and its items to this NDJSON file first.")
+        parser.add_argument('--dry-run', action='store_true', help="Count stale carts without deleting them.")
+        parser.add_argument('--loop', action='store_true', help="Run again every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=3600.0)
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        while self.running:
+            self.run_once(options)
+            if not options['loop']:
+                break
+            deadline = time.monotonic() + options['interval']
+            while self.running and time.monotonic() < deadline:
+                time.sleep(min(1.0, options['interval']))
+
+    def run_once(self, options):
+        ttl_days = options['ttl_days'] if options['ttl_days'] is not None else settings.CART_TTL_DAYS
+        cutoff = timezone.now() - timedelta(days=ttl_days)
+        archive = open(options['archive'], 'a', encoding='utf-8') if options['archive'] else None
+        scanned = carts = items = 0
+        started = time.perf_counter()
+        try:
+            for chunk in purge_stale_carts(cutoff, options['batch_size'], archive=archive, dry_run=options['dry_run']):
+                scanned += chunk.scanned
+                carts += chunk.carts
+                items += chunk.items
+                if not self.running:
+                    break
+        finally:
+            if archive is not None:
+                archive.close()
+        elapsed = time.perf_counter() - started
+        verb = "Found" if options['dry_run'] else "Removed"
+        self.stdout.write(
+            f"{verb} {carts} stale carts and {items} items out of {scanned} carts in {elapsed:.1f}s "
+            f"({(carts + items) / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+
+    def stop(self, signum, frame):
+        self.running = False
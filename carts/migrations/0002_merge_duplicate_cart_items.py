@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    # Fold repeated (cart, product) lines into the oldest one so the unique
+    # constraint added next can be created.
+    CartItem = apps.get_model('carts', 'CartItem')
+    duplicates = (
+        CartItem.objects.order_by()
+        .values('cart_id', 'product_id')
+        .annotate(lines=Count('id'), total=Sum('quantity'))
+        .filter(lines__gt=1)
+    )
+    for row in duplicates.iterator():
+        items = CartItem.objects.filter(cart_id=row['cart_id'], product_id=row['product_id'])
+        keep = items.order_by('added_at', 'id').values_list('id', flat=True).first()
+        items.filter(id=keep).update(quantity=row['total'])
+        items.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+    ]
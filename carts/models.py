@@ -17,6 +17,10 @@ class Cart(models.Model):
         db_table = 'cart'
         verbose_name = "Cart"
         verbose_name_plural = "Carts"
+        indexes = [
+            # "Latest cart of this user", used by checkout and the cart views.
+            models.Index(fields=['user', '-created_at'], name='cart_user_created_idx'),
+        ]
 
 class CartItem(models.Model):
     id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
@@ -29,4 +33,7 @@ class CartItem(models.Model):
         db_table = 'cart_item'
         verbose_name = "Cart Item"
         verbose_name_plural = "Cart Items"
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='cart_item_unique_product'),
+        ]
     
\ No newline at end of file
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Cart, CartItem
-from products.models.product_models import Products
+from .models import CartItem
+from .services import add_to_cart
+from products.services.inventory_services import InsufficientStock
 
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -13,20 +14,43 @@ class CartItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'added_at', 'cart_id']
 
     def create(self, validated_data):
-        user = self.context['request'].user
-        product_id = validated_data.pop('product_id')
-        cart_id = validated_data.pop('cart_id', None)
-        product = Products.objects.get(product_id=product_id)
-        if cart_id:
-            cart = Cart.objects.get(cart_id=cart_id, user=user)
-        else:
-            cart, _ = Cart.objects.get_or_create(user=user)
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart, product=product,
-            defaults={'quantity': validated_data.get('quantity', 1)}
-        )
-        if not created:
-            cart_item.quantity += validated_data.get('quantity', 1)
-            cart_item.save()
-        return cart_item
-    
\ No newline at end of file
+        try:
+            return add_to_cart(
+                self.context['request'].user,
+                validated_data['product_id'],
+                validated_data.get('quantity', 1),
+            )
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({'quantity': exc.messages()})
+    
+
+class CartBatchLineSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=0, default=1)
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'], default='add')
+
+
+class CartBatchSerializer(serializers.Serializer):
+    cart_id = serializers.UUIDField(required=False)
+    items = CartBatchLineSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class CartDetailLineSerializer(serializers.ModelSerializer):
+    product_id = serializers.UUIDField(read_only=True)
+    name = serializers.CharField(source='product.name', read_only=True)
+    price = serializers.DecimalField(source='product.price', max_digits=10, decimal_places=2, read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    in_stock = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = CartItem
+        fields = ['id', 'product_id', 'name', 'price', 'quantity', 'subtotal', 'in_stock', 'added_at']
+        read_only_fields = fields
+
+
+class CartDetailSerializer(serializers.Serializer):
+    cart_id = serializers.UUIDField(source='cart.cart_id')
+    items = CartDetailLineSerializer(source='lines', many=True)
+    total_amount = serializers.DecimalField(source='totals.total', max_digits=12, decimal_places=2)
+    line_count = serializers.IntegerField(source='totals.line_count')
+    item_count = serializers.IntegerField(source='totals.item_count')
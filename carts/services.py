@@ -0,0 +1,313 @@
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, transaction
+from django.db.models import BooleanField, Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.metrics import registry
+from products.models.product_models import Products
+from products.services.inventory_services import InsufficientStock
+
+from .models import Cart, CartItem
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+registry.describe('ministore_cart_cleanup_rows_total', 'Rows removed by the stale-cart cleanup, by table.')
+registry.describe('ministore_cart_cleanup_seconds_total', 'Time spent removing stale carts; rows/sec is rows_total over this.')
+
+
+@dataclass(frozen=True)
+class CartTotals:
+    total: Decimal
+    line_count: int
+    item_count: int
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            total=Decimal(row['total']).quantize(Decimal('0.01')),
+            line_count=row['line_count'],
+            item_count=row['item_count'],
+        )
+
+
+@dataclass(frozen=True)
+class CartDetail:
+    cart: Cart
+    lines: list
+    totals: CartTotals
+
+
+def line_total_expression(prefix=''):
+    return ExpressionWrapper(F(f'{prefix}quantity') * F(f'{prefix}product__price'), output_field=MONEY)
+
+
+def cart_totals_aggregates(prefix=''):
+    """Aggregates for a cart's total; `prefix` is the path to CartItem."""
+    return {
+        'total': Coalesce(Sum(line_total_expression(prefix)), Decimal('0.00'), output_field=MONEY),
+        'line_count': Count(f'{prefix}pk'),
+        'item_count': Coalesce(Sum(f'{prefix}quantity'), 0),
+    }
+
+
+def get_cart_totals(cart_id):
+    """Price a cart with a single aggregate query."""
+    totals = CartItem.objects.filter(cart_id=cart_id).aggregate(**cart_totals_aggregates())
+    return CartTotals.from_row(totals)
+
+
+def _cart_with_totals(user, cart_id=None):
+    carts = Cart.objects.filter(user=user).annotate(**cart_totals_aggregates('items__'))
+    if cart_id:
+        return carts.filter(cart_id=cart_id)
+    return carts.order_by('-created_at')
+
+
+def _cart_lines(cart):
+    return (
+        cart.items.select_related('product')
+        .annotate(
+            subtotal=line_total_expression(),
+            in_stock=ExpressionWrapper(Q(product__quantity__gte=F('quantity')), output_field=BooleanField()),
+        )
+        .order_by('added_at')
+    )
+
+
+def _cart_detail(cart, lines):
+    totals = CartTotals.from_row({
+        'total': cart.total,
+        'line_count': cart.line_count,
+        'item_count': cart.item_count,
+    })
+    return CartDetail(cart=cart, lines=lines, totals=totals)
+
+
+def get_cart_detail(user, cart_id=None):
+    """
+    Load a cart page in two queries: the cart with its totals aggregated in
+    SQL, then its lines joined to their products. Returns None when the user
+    has no such cart. Without `cart_id` the user's latest cart is used.
+    """
+    cart = _cart_with_totals(user, cart_id).first()
+    if cart is None:
+        return None
+    return _cart_detail(cart, list(_cart_lines(cart)))
+
+
+async def aget_cart_detail(user, cart_id=None):
+    """Async `get_cart_detail` using the async ORM."""
+    cart = await _cart_with_totals(user, cart_id).afirst()
+    if cart is None:
+        return None
+    return _cart_detail(cart, [line async for line in _cart_lines(cart)])
+
+
+class UnknownProducts(Exception):
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        super().__init__(product_ids)
+
+
+def get_or_create_current_cart(user, cart_id=None):
+    if cart_id:
+        return Cart.objects.get(cart_id=cart_id, user=user)
+    cart = Cart.objects.filter(user=user).order_by('-created_at').first()
+    return cart or Cart.objects.create(user=user)
+
+
+# Inserts the line, or adds to the existing one, only while the product has
+# enough stock for the resulting quantity. Returns no row when the product is
+# missing or short.
+ADD_TO_CART_SQL = """
+    INSERT INTO cart_item (id, cart_id, product_id, quantity, added_at)
+    SELECT %s, %s, product_id, %s, %s FROM products
+    WHERE product_id = %s AND quantity >= %s
+    ON CONFLICT (cart_id, product_id) DO UPDATE
+    SET quantity = cart_item.quantity + excluded.quantity
+    WHERE (SELECT quantity FROM products WHERE product_id = excluded.product_id)
+        >= cart_item.quantity + excluded.quantity
+    RETURNING id, cart_id, product_id, quantity, added_at
+"""
+
+
+def _prep(field_name, value):
+    return CartItem._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+
+def _upsert_cart_item(cart, product_id, quantity):
+    params = [
+        _prep('id', uuid.uuid4()), _prep('cart', cart.pk), quantity, _prep('added_at', timezone.now()),
+        _prep('product', product_id), quantity,
+    ]
+    items = list(CartItem.objects.raw(ADD_TO_CART_SQL, params))
+    return items[0] if items else None
+
+
+def _increment_cart_item(cart, product_id, quantity):
+    stock = Products.objects.values_list('quantity', flat=True).get(pk=product_id)
+    if quantity > stock:
+        return None
+    try:
+        with transaction.atomic():
+            return CartItem.objects.create(cart=cart, product_id=product_id, quantity=quantity)
+    except IntegrityError:
+        pass
+    updated = CartItem.objects.filter(cart=cart, product_id=product_id, quantity__lte=stock - quantity).update(
+        quantity=F('quantity') + quantity
+    )
+    return CartItem.objects.get(cart=cart, product_id=product_id) if updated else None
+
+
+def add_to_cart(user, product_id, quantity=1, cart_id=None):
+    """
+    Add `quantity` of a product to the user's current cart (or `cart_id`).
+
+    A single INSERT ... ON CONFLICT DO UPDATE creates the line or increments
+    it in the database, so concurrent adds to the same line never lose an
+    update. Backends without upsert RETURNING fall back to an F() increment.
+    Raises Products.DoesNotExist for an unknown product and InsufficientStock
+    when the line would exceed the product's stock.
+    """
+    upsert = connection.features.supports_update_conflicts_with_target and (
+        connection.features.can_return_rows_from_bulk_insert
+    )
+    cart = get_or_create_current_cart(user, cart_id)
+    item = (_upsert_cart_item if upsert else _increment_cart_item)(cart, product_id, quantity)
+    if item is None:
+        name, available = Products.objects.values_list('name', 'quantity').get(pk=product_id)
+        in_cart = CartItem.objects.filter(cart=cart, product_id=product_id).values_list('quantity', flat=True)
+        raise InsufficientStock([(name, quantity + (in_cart.first() or 0), available)])
+    item.cart = cart
+    return item
+
+
+def apply_cart_batch(user, lines, cart_id=None):
+    """
+    Apply many `{product_id, quantity, op}` lines to a cart in one
+    transaction with a fixed number of queries. `op` is `add` (increase),
+    `set` (replace, 0 removes) or `remove`. Lines are applied in order.
+    """
+    product_ids = list(dict.fromkeys(line['product_id'] for line in lines))
+    with transaction.atomic():
+        cart = get_or_create_current_cart(user, cart_id)
+        known = set(Products.objects.filter(pk__in=product_ids).values_list('pk', flat=True))
+        unknown = [product_id for product_id in product_ids if product_id not in known]
+        if unknown:
+            raise UnknownProducts(unknown)
+
+        existing = {
+            item.product_id: item
+            for item in CartItem.objects.select_for_update().filter(cart=cart, product_id__in=product_ids)
+        }
+
+        quantities = {product_id: item.quantity for product_id, item in existing.items()}
+        for line in lines:
+            product_id, quantity = line['product_id'], line.get('quantity', 1)
+            if line['op'] == 'add':
+                quantities[product_id] = quantities.get(product_id, 0) + quantity
+            elif line['op'] == 'set':
+                quantities[product_id] = quantity
+            else:
+                quantities[product_id] = 0
+
+        to_upsert, to_delete = [], []
+        for product_id, quantity in quantities.items():
+            item = existing.get(product_id)
+            if item is not None and quantity <= 0:
+                to_delete.append(item.pk)
+            elif quantity > 0 and (item is None or quantity != item.quantity):
+                to_upsert.append(CartItem(cart=cart, product_id=product_id, quantity=quantity))
+
+        # New and changed lines in one statement; the (cart, product) unique
+        # constraint turns changed lines into updates.
+        CartItem.objects.bulk_create(
+            to_upsert, update_conflicts=True, unique_fields=['cart', 'product'], update_fields=['quantity']
+        )
+        if to_delete:
+            CartItem.objects.filter(pk__in=to_delete).delete()
+    return cart
+
+
+@dataclass(frozen=True)
+class CleanupChunk:
+    scanned: int
+    carts: int
+    items: int
+    seconds: float
+
+
+def stale_carts(cutoff):
+    """
+    Carts created before `cutoff` with no item added since, no order and no
+    payment: abandoned carts that are safe to remove.
+    """
+    return (
+        Cart.objects.filter(created_at__lt=cutoff, order__isnull=True, payments__isnull=True)
+        .exclude(items__added_at__gte=cutoff)
+    )
+
+
+def _archive(carts, cart_ids, archive):
+    items = {cart_id: [] for cart_id in cart_ids}
+    for item in CartItem.objects.filter(cart_id__in=cart_ids).values('cart_id', 'product_id', 'quantity', 'added_at'):
+        items[item.pop('cart_id')].append(item)
+    for cart in carts:
+        archive.write(json.dumps({**cart, 'items': items[cart['cart_id']]}, cls=DjangoJSONEncoder) + '\n')
+    archive.flush()
+
+
+def purge_stale_carts(cutoff, batch_size=1000, archive=None, dry_run=False):
+    """
+    Delete stale carts (see `stale_carts`) and their items, walking the cart
+    table in primary-key windows of `batch_size` rows with one short
+    transaction per window, so no statement or lock covers more than one
+    window. With `archive` (a text file) each cart and its items is written
+    there as one NDJSON line before it is deleted; a window that fails to
+    commit may leave lines for carts that still exist. Yields a
+    CleanupChunk per window.
+    """
+    last_cart_id = None
+    while True:
+        started = time.perf_counter()
+        window = Cart.objects.order_by('cart_id')
+        if last_cart_id is not None:
+            window = window.filter(cart_id__gt=last_cart_id)
+        window_ids = list(window.values_list('cart_id', flat=True)[:batch_size])
+        if not window_ids:
+            return
+        last_cart_id = window_ids[-1]
+
+        with transaction.atomic():
+            carts = list(
+                stale_carts(cutoff)
+                .filter(cart_id__in=window_ids)
+                .select_for_update(of=('self',))
+                .order_by('cart_id')
+                .values('cart_id', 'user_id', 'created_at')
+            )
+            cart_ids = [cart['cart_id'] for cart in carts]
+            deleted = {}
+            if cart_ids and not dry_run:
+                if archive is not None:
+                    _archive(carts, cart_ids, archive)
+                _, deleted = Cart.objects.filter(cart_id__in=cart_ids).delete()
+
+        chunk = CleanupChunk(
+            scanned=len(window_ids),
+            carts=len(cart_ids),
+            items=deleted.get(CartItem._meta.label, 0),
+            seconds=time.perf_counter() - started,
+        )
+        if not dry_run:
+            registry.increment('ministore_cart_cleanup_rows_total', chunk.carts, labels={'table': 'cart'})
+            registry.increment('ministore_cart_cleanup_rows_total', chunk.items, labels={'table': 'cart_item'})
+            registry.increment('ministore_cart_cleanup_seconds_total', chunk.seconds)
+        yield chunk
@@ -1,10 +1,26 @@
-from django.test import TestCase
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIRequestFactory, force_authenticate
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 from rest_framework.request import Request
 import uuid
+from datetime import timedelta
+from decimal import Decimal
 from .serializers import CartItemSerializer
+from .services import add_to_cart, get_cart_totals, purge_stale_carts
+from core.metrics import registry
+from core.testing import QueryBudgetMixin
 from .models import Cart, CartItem
+from orders.models import Order
+from payments.models import Payment
 from products.models.product_models import Products
 
 User = get_user_model()
@@ -172,4 +188,348 @@ class CartItemSerializerTest(TestCase):
             'quantity': 0
         }
         serializer = CartItemSerializer(data=data, context=self.get_request_context())
-        self.assertTrue(serializer.is_valid())
\ No newline at end of file
+        self.assertTrue(serializer.is_valid())
+
+class CartTotalsServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.cart = Cart.objects.create(user=self.user)
+
+    def test_empty_cart(self):
+        """Test that an empty cart prices to zero"""
+        totals = get_cart_totals(self.cart.cart_id)
+        self.assertEqual(totals.total, Decimal('0.00'))
+        self.assertEqual(totals.line_count, 0)
+        self.assertEqual(totals.item_count, 0)
+
+    def test_totals_are_exact_and_single_query(self):
+        """Test that totals are exact Decimals computed in one query"""
+        for i in range(200):
+            product = Products.objects.create(
+                name=f'Product {i}',
+                price=Decimal('0.10') + Decimal(i) / 100,
+                quantity=100,
+                created_by=self.user
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=i % 3 + 1)
+        expected = sum(
+            (item.product.price * item.quantity for item in self.cart.items.select_related('product')),
+            Decimal('0.00')
+        )
+
+        with self.assertNumQueries(1):
+            totals = get_cart_totals(self.cart.cart_id)
+
+        self.assertEqual(totals.total, expected)
+        self.assertIsInstance(totals.total, Decimal)
+        self.assertEqual(totals.line_count, 200)
+        self.assertEqual(totals.item_count, sum(i % 3 + 1 for i in range(200)))
+
+
+class CartBatchViewTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        """Set up a user with a catalog and an authenticated client"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.products = [
+            Products.objects.create(
+                name=f'Product {i}',
+                price=Decimal('2.50'),
+                quantity=100,
+                created_by=self.user
+            )
+            for i in range(30)
+        ]
+        self.cart = Cart.objects.create(user=self.user)
+
+    def post_batch(self, items, **extra):
+        return self.client.post('/carts/batch/', {'items': items, **extra}, format='json')
+
+    def test_add_set_and_remove_lines(self):
+        """Test that add, set and remove ops are applied in order"""
+        first, second, third = self.products[:3]
+        CartItem.objects.create(cart=self.cart, product=first, quantity=1)
+        CartItem.objects.create(cart=self.cart, product=second, quantity=5)
+
+        response = self.post_batch([
+            {'product_id': str(first.product_id), 'quantity': 2},
+            {'product_id': str(second.product_id), 'op': 'remove'},
+            {'product_id': str(third.product_id), 'quantity': 4, 'op': 'set'},
+            {'product_id': str(third.product_id), 'quantity': 1, 'op': 'add'},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cart_id'], str(self.cart.cart_id))
+        quantities = dict(self.cart.items.values_list('product_id', 'quantity'))
+        self.assertEqual(quantities, {first.product_id: 3, third.product_id: 5})
+        self.assertEqual(response.data['item_count'], 8)
+        self.assertEqual(response.data['line_count'], 2)
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('20.00'))
+        self.assertEqual(
+            {item['product_id'] for item in response.data['items']},
+            {str(first.product_id), str(third.product_id)}
+        )
+
+    def test_within_query_budget(self):
+        """Test that a mixed batch stays within the declared query budget"""
+        CartItem.objects.create(cart=self.cart, product=self.products[0], quantity=1)
+        CartItem.objects.create(cart=self.cart, product=self.products[1], quantity=1)
+        items = [
+            {'product_id': str(self.products[0].product_id), 'quantity': 2},
+            {'product_id': str(self.products[1].product_id), 'op': 'remove'},
+        ] + [{'product_id': str(product.product_id)} for product in self.products[2:]]
+        self.assertWithinQueryBudget('post', '/carts/batch/', {'items': items}, format='json')
+
+    def test_set_zero_removes_line(self):
+        """Test that setting a quantity of zero removes the line"""
+        CartItem.objects.create(cart=self.cart, product=self.products[0], quantity=3)
+        self.post_batch([{'product_id': str(self.products[0].product_id), 'quantity': 0, 'op': 'set'}])
+        self.assertFalse(self.cart.items.exists())
+
+    def test_unknown_product_rolls_back_whole_batch(self):
+        """Test that one bad line leaves the cart untouched"""
+        response = self.post_batch([
+            {'product_id': str(self.products[0].product_id), 'quantity': 1},
+            {'product_id': str(uuid.uuid4()), 'quantity': 1},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('items', response.data)
+        self.assertFalse(self.cart.items.exists())
+
+    def test_foreign_cart_rejected(self):
+        """Test that a batch cannot target another user's cart"""
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        response = self.post_batch(
+            [{'product_id': str(self.products[0].product_id)}],
+            cart_id=str(Cart.objects.create(user=other).cart_id)
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cart_id', response.data)
+
+    def test_query_count_independent_of_batch_size(self):
+        """Test that a batch costs the same number of queries for 3 or 30 lines"""
+        def run(products):
+            CartItem.objects.filter(cart=self.cart).delete()
+            CartItem.objects.bulk_create(
+                [CartItem(cart=self.cart, product=product, quantity=1) for product in products[::2]]
+            )
+            items = [
+                {'product_id': str(product.product_id), 'quantity': 2, 'op': op}
+                for product, op in zip(products, ['add', 'set', 'remove'] * len(products))
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post_batch(items)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        self.assertEqual(run(self.products[:3]), run(self.products))
+
+
+class CartDetailViewTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        """Set up a user with an authenticated client and an empty cart"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+
+    def add_lines(self, count):
+        start = Products.objects.count()
+        for i in range(start, start + count):
+            product = Products.objects.create(
+                name=f'Product {i}',
+                price=Decimal('1.25'),
+                quantity=i,
+                created_by=self.user
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+
+    def test_lines_embed_products_and_totals(self):
+        """Test that lines carry product name, price, subtotal and stock flag"""
+        self.add_lines(3)
+        response = self.client.get('/carts/detail/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cart_id'], str(self.cart.cart_id))
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('7.50'))
+        self.assertEqual(response.data['line_count'], 3)
+        self.assertEqual(response.data['item_count'], 6)
+        lines = {line['name']: line for line in response.data['items']}
+        self.assertEqual(Decimal(lines['Product 1']['price']), Decimal('1.25'))
+        self.assertEqual(Decimal(lines['Product 1']['subtotal']), Decimal('2.50'))
+        self.assertFalse(lines['Product 1']['in_stock'])
+        self.assertTrue(lines['Product 2']['in_stock'])
+
+    def test_query_count_constant(self):
+        """Test that a cart page stays within budget whatever its size"""
+        self.add_lines(1)
+        self.assertWithinQueryBudget('get', '/carts/detail/')
+        self.add_lines(40)
+        self.assertWithinQueryBudget('get', '/carts/detail/')
+
+    def test_empty_cart(self):
+        """Test that an empty cart has zero totals"""
+        response = self.client.get('/carts/detail/', {'cart_id': str(self.cart.cart_id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['items'], [])
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('0.00'))
+
+    def test_other_users_cart_not_found(self):
+        """Test that another user's cart is not visible"""
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        other_cart = Cart.objects.create(user=other)
+        response = self.client.get('/carts/detail/', {'cart_id': str(other_cart.cart_id)})
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_view_matches_sync_view(self):
+        """Test that the async cart view returns the same payload"""
+        self.add_lines(2)
+        sync = self.client.get('/carts/detail/').json()
+        response = self.client.get('/carts/async/detail/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync)
+
+
+class AddToCartViewTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        """Set up a user with a stocked product and an authenticated client"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.product = Products.objects.create(name='Test Product', price=Decimal('2.50'), quantity=5, created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+
+    def add(self, quantity):
+        return self.client.post(
+            '/carts/add/', {'product_id': str(self.product.product_id), 'quantity': quantity}, format='json'
+        )
+
+    def test_adds_increment_one_line(self):
+        """Test that repeated adds increment the same line in one upsert each"""
+        data = {'product_id': str(self.product.product_id), 'quantity': 2}
+        first = self.assertWithinQueryBudget('post', '/carts/add/', data, format='json')
+        self.assertEqual(first.status_code, 201)
+        second = self.assertWithinQueryBudget('post', '/carts/add/', {**data, 'quantity': 3}, format='json')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(second.data['quantity'], 5)
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+    def test_stock_checked_against_line_total(self):
+        """Test that an add pushing the line past stock is rejected"""
+        self.add(4)
+        response = self.add(2)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('requested: 6, available: 5', response.data['quantity'][0])
+        self.assertEqual(CartItem.objects.get().quantity, 4)
+
+    def test_adds_to_latest_cart(self):
+        """Test that a user with several carts adds to the newest one"""
+        latest = Cart.objects.create(user=self.user)
+        self.add(1)
+        self.assertEqual(CartItem.objects.get().cart, latest)
+
+    def test_increment_fallback(self):
+        """Test the F() increment used by backends without upsert"""
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self.assertEqual(self.add(2).status_code, 201)
+            self.assertEqual(self.add(3).data['quantity'], 5)
+            self.assertEqual(self.add(1).status_code, 400)
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+
+class ConcurrentAddToCartTest(TransactionTestCase):
+    workers = 8
+    adds = 80
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.product = Products.objects.create(name='Hot SKU', price=5, quantity=1000, created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+
+    def add(self, _):
+        # Django's in-memory test database uses SQLite's shared cache, where a
+        # table lock fails at once instead of waiting on busy_timeout. Only
+        # that error is retried; anything else (including "database is
+        # locked", i.e. busy_timeout exhausted) fails the test.
+        deadline = time.monotonic() + 30
+        try:
+            while True:
+                try:
+                    add_to_cart(self.user, self.product.pk, 1)
+                    return
+                except OperationalError as exc:
+                    if 'table is locked' not in str(exc) or time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.001)
+        finally:
+            connection.close()
+
+    def test_parallel_adds_lose_no_updates(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(self.add, range(self.adds)))
+        self.assertEqual(CartItem.objects.get(cart=self.cart).quantity, self.adds)
+
+
+class StaleCartCleanupTest(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.product = Products.objects.create(name='Test Product', price=1, quantity=10, created_by=self.user)
+        self.now = timezone.now()
+        self.cutoff = self.now - timedelta(days=30)
+        old = self.now - timedelta(days=90)
+
+        def cart(lines=0, added_at=old):
+            cart = Cart.objects.create(user=self.user)
+            Cart.objects.filter(pk=cart.pk).update(created_at=old)
+            for _ in range(lines):
+                item = CartItem.objects.create(
+                    cart=cart, product=Products.objects.create(name=str(uuid.uuid4()), created_by=self.user)
+                )
+                CartItem.objects.filter(pk=item.pk).update(added_at=added_at)
+            return cart
+
+        self.abandoned = [cart(), cart(lines=2), cart(lines=1)]
+        self.recently_used = cart(lines=1, added_at=self.now)
+        self.ordered = cart(lines=1)
+        Order.objects.create(cart=self.ordered)
+        self.paid = cart()
+        Payment.objects.create(cart=self.paid, amount=Decimal('1.00'))
+        self.fresh = Cart.objects.create(user=self.user)
+        self.kept = {self.recently_used.pk, self.ordered.pk, self.paid.pk, self.fresh.pk}
+
+    def test_removes_only_abandoned_carts_in_windows(self):
+        archive = io.StringIO()
+        chunks = list(purge_stale_carts(self.cutoff, batch_size=2, archive=archive))
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(all(chunk.scanned <= 2 for chunk in chunks))
+        self.assertEqual((sum(chunk.carts for chunk in chunks), sum(chunk.items for chunk in chunks)), (3, 3))
+        self.assertEqual(set(Cart.objects.values_list('pk', flat=True)), self.kept)
+        self.assertEqual(CartItem.objects.count(), 2)
+
+        archived = [json.loads(line) for line in archive.getvalue().splitlines()]
+        self.assertEqual({cart['cart_id'] for cart in archived}, {str(cart.pk) for cart in self.abandoned})
+        self.assertEqual(sorted(len(cart['items']) for cart in archived), [0, 1, 2])
+
+        metrics = registry.render()
+        self.assertIn('ministore_cart_cleanup_rows_total{table="cart"} 3', metrics)
+        self.assertIn('ministore_cart_cleanup_rows_total{table="cart_item"} 3', metrics)
+
+    def test_dry_run_command_deletes_nothing(self):
+        out = io.StringIO()
+        call_command('cleanup_stale_carts', '--dry-run', stdout=out)
+        self.assertIn('Found 3 stale carts', out.getvalue())
+        self.assertEqual(Cart.objects.count(), 7)
+        call_command('cleanup_stale_carts', '--ttl-days', '30', stdout=out)
+        self.assertEqual(set(Cart.objects.values_list('pk', flat=True)), self.kept)
@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import AddToCartView, RemoveFromCartView, ListCartView
+from .views import AddToCartView, RemoveFromCartView, ListCartView, BatchCartView, CartDetailView, AsyncCartDetailView
 
 urlpatterns = [
     path('add/', AddToCartView.as_view(), name='add-to-cart'),
     path('remove/<uuid:pk>/', RemoveFromCartView.as_view(), name='remove-from-cart'),
     path('list/', ListCartView.as_view(), name='list-cart'),
+    path('batch/', BatchCartView.as_view(), name='batch-cart'),
+    path('detail/', CartDetailView.as_view(), name='cart-detail'),
+    path('async/detail/', AsyncCartDetailView.as_view(), name='cart-detail-async'),
 ]
\ No newline at end of file
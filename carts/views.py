@@ -1,9 +1,13 @@
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, serializers, status
+from rest_framework.response import Response
 
-from .models import CartItem
-from .serializers import CartItemSerializer
+from .models import Cart, CartItem
+from .serializers import CartItemSerializer, CartBatchSerializer, CartDetailSerializer
+from .services import UnknownProducts, aget_cart_detail, apply_cart_batch, get_cart_detail
+from core.async_views import AsyncAPIView
 
 class AddToCartView(generics.CreateAPIView):
     serializer_class = CartItemSerializer
@@ -32,6 +36,40 @@ class ListCartView(generics.ListAPIView):
         user = self.request.user
         return CartItem.objects.filter(cart__user=user)
 
+class CartDetailView(generics.GenericAPIView):
+    serializer_class = CartDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the authenticated user's cart with product details, line subtotals and totals",
+        manual_parameters=[
+            openapi.Parameter(
+                'cart_id', openapi.IN_QUERY, description="Cart UUID, defaults to the latest cart", type=openapi.TYPE_STRING
+            )
+        ],
+        responses={200: CartDetailSerializer}
+    )
+    def get(self, request, *args, **kwargs):
+        cart_id = request.query_params.get('cart_id')
+        if cart_id:
+            cart_id = serializers.UUIDField().run_validation(cart_id)
+        detail = get_cart_detail(request.user, cart_id)
+        if detail is None:
+            return Response({'detail': 'Cart not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self.get_serializer(detail).data)
+
+class AsyncCartDetailView(AsyncAPIView):
+    serializer_class = CartDetailSerializer
+
+    async def get(self, request, *args, **kwargs):
+        cart_id = request.query_params.get('cart_id')
+        if cart_id:
+            cart_id = serializers.UUIDField().run_validation(cart_id)
+        detail = await aget_cart_detail(request.user, cart_id)
+        if detail is None:
+            return self.json_response({'detail': 'Cart not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return self.json_response(CartDetailSerializer(detail).data)
+
 class RemoveFromCartView(generics.DestroyAPIView):
     serializer_class = CartItemSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -46,4 +84,29 @@ class RemoveFromCartView(generics.DestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         return CartItem.objects.filter(cart__user=user)
-    
\ No newline at end of file
+
+
+class BatchCartView(generics.GenericAPIView):
+    serializer_class = CartBatchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Add, update and remove many cart lines in one atomic request",
+        request_body=CartBatchSerializer,
+        responses={200: CartDetailSerializer}
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            cart = apply_cart_batch(
+                request.user,
+                serializer.validated_data['items'],
+                cart_id=serializer.validated_data.get('cart_id'),
+            )
+        except Cart.DoesNotExist:
+            raise serializers.ValidationError({'cart_id': 'Cart not found.'})
+        except UnknownProducts as exc:
+            raise serializers.ValidationError({'items': [f"Product {product_id} not found." for product_id in exc.product_ids]})
+        detail = get_cart_detail(request.user, cart.cart_id)
+        return Response(CartDetailSerializer(detail).data, status=status.HTTP_200_OK)
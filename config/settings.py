@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,14 +44,17 @@ INSTALLED_APPS = [
     'drf_yasg',
 
     # local apps
+    'core',
     'authentication',
     'products',
     'carts',
     'orders',
     'payments',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,18 +86,99 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# DB_ENGINE=postgres for multi-worker deployments; the SQLite default is for
+# single-node use.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'ministore'),
+            'USER': os.environ.get('POSTGRES_USER', 'ministore'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'ministore'),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get('DB_POOL', 'false').lower() == 'true':
+        # psycopg 3 connection pool, one per worker process. Pooling and
+        # persistent connections are mutually exclusive in Django.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # WAL lets readers run alongside the single writer, and
+                # IMMEDIATE transactions queue writers on busy_timeout instead
+                # of failing with "database is locked" on lock upgrade.
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))};"
+                ),
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Set REDIS_URL (e.g. redis://redis:6379/0) to share the cache between workers.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'mini-store',
+        }
     }
-}
 
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Hasher for new passwords: pbkdf2 (default), argon2 (needs argon2-cffi) or
+# bcrypt (needs bcrypt). The others stay listed so existing hashes still
+# verify; they are re-hashed with the chosen one on the next successful login.
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'authentication.hashers.TunablePBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CHOICES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# Unset keeps Django's default iteration count.
+PBKDF2_ITERATIONS = int(os.environ['PBKDF2_ITERATIONS']) if os.environ.get('PBKDF2_ITERATIONS') else None
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -149,8 +234,65 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'authentication.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.ClaimsJWTAuthentication',
     ],
+    # Counters live in the default cache; share it (REDIS_URL) across workers.
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('THROTTLE_LOGIN_IP', '20/min'),
+        'login_email': os.environ.get('THROTTLE_LOGIN_EMAIL', '5/min'),
+        'signup_ip': os.environ.get('THROTTLE_SIGNUP_IP', '10/hour'),
+    },
+}
+
+# Cache holding the flags of users deactivated, demoted or deleted since their
+# tokens were issued. With a per-process cache (no REDIS_URL) the flags are
+# read from the database instead and kept this many seconds per worker.
+AUTH_REVOCATION_CACHE_ALIAS = 'default'
+AUTH_REVOCATION_LOCAL_TTL = int(os.environ.get('AUTH_REVOCATION_LOCAL_TTL', 5))
+
+# Responses to POSTs carrying an Idempotency-Key are kept this long (seconds)
+# in the idempotency_keys table and replayed on retries. A claim left by a
+# request that never finished can be taken over after the lock timeout.
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 60 * 60))
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+
+# Payments are queued in the payments table and settled by
+# `manage.py process_payments`. Failed gateway calls are retried with
+# exponential backoff (seconds) up to PAYMENT_MAX_ATTEMPTS times.
+PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY', 'payments.gateways.LocalGateway')
+PAYMENT_MAX_ATTEMPTS = int(os.environ.get('PAYMENT_MAX_ATTEMPTS', 5))
+PAYMENT_RETRY_BACKOFF = 5
+PAYMENT_RETRY_BACKOFF_MAX = 300
+PAYMENT_PROCESSING_TIMEOUT = 300
+
+# `manage.py cleanup_stale_carts` removes carts untouched for this many days
+# that never reached an order or payment.
+CART_TTL_DAYS = int(os.environ.get('CART_TTL_DAYS', 30))
+
+PRODUCT_CACHE_ALIAS = 'default'
+PRODUCT_CACHE_ENABLED = os.environ.get('PRODUCT_CACHE_ENABLED', 'true').lower() == 'true'
+PRODUCT_CACHE_TIMEOUT = int(os.environ.get('PRODUCT_CACHE_TIMEOUT', 300))
+
+# Maximum SQL queries per request, keyed by URL name. JWT authentication
+# builds the user from token claims, so no user lookup is included. Requests
+# over budget are logged and counted in /metrics, and QueryBudgetMixin fails
+# tests over them.
+QUERY_BUDGETS = {
+    'product-list-create': 2,
+    'product-detail': 1,
+    'product-update': 3,  # product, unique-name check when renamed, UPDATE
+    'my-products': 1,
+    'my-products-bulk-update': 3,
+    'my-products-bulk-delete': 5,  # order lines, cart lines, products, in a transaction
+    # Cursor claim, product lookup and one UPDATE inside a transaction; a
+    # feed's first batch also reads and creates its cursor in a savepoint.
+    'stock-adjustments': 9,
+    'add-to-cart': 2,
+    'cart-detail': 2,
+    'cart-total': 2,
+    'batch-cart': 10,
+    'order-history': 2,
+    'order-detail': 2,
 }
 
 SWAGGER_SETTINGS = {
@@ -24,6 +24,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from core.views import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Mini Store API",
@@ -41,6 +43,7 @@ urlpatterns = [
     path('carts/', include('carts.urls')),
     path('orders/', include('orders.urls')),
     path('payments/', include('payments.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 urlpatterns += [
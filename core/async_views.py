@@ -0,0 +1,46 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of DRF's APIView for the read-heavy endpoints served
+    under ASGI. It authenticates with the configured DRF authentication
+    classes, requires an authenticated user, maps APIExceptions to JSON error
+    responses and renders with DRF's JSON encoder. Handlers are `async def`
+    and receive the DRF Request.
+    """
+    http_method_names = ['get', 'head']
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    serializer_class = None
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        handler = getattr(self, request.method.lower(), None)
+        try:
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            await self.authenticate()
+            return await handler(self.request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(exc)
+
+    async def authenticate(self):
+        user = await sync_to_async(lambda: self.request.user)()
+        if not user or not user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    def error_response(self, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return self.json_response(data, status=exc.status_code)
+
+    def json_response(self, data, status=200):
+        return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
@@ -0,0 +1,42 @@
+import calendar
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+PRECONDITION_HEADERS = ('If-Match', 'If-Unmodified-Since')
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource was modified since the given ETag or date.'
+    default_code = 'precondition_failed'
+
+
+def get_validators(updated_at):
+    """ETag (microsecond precision) and Last-Modified timestamp for a row's `updated_at`."""
+    seconds = calendar.timegm(updated_at.utctimetuple())
+    return quote_etag(f'{seconds * 1_000_000 + updated_at.microsecond:x}'), seconds
+
+
+def set_validators(response, updated_at):
+    etag, last_modified = get_validators(updated_at)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def conditional_response(request, updated_at):
+    """
+    Evaluate the request's If-Match / If-None-Match / If-Modified-Since /
+    If-Unmodified-Since headers against `updated_at`. Returns a 304 (safe
+    methods) or 412 response to send instead, or None to carry on.
+    """
+    etag, last_modified = get_validators(updated_at)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return response if response is None else set_validators(response, updated_at)
+
+
+def has_write_precondition(request):
+    return any(header in request.headers for header in PRECONDITION_HEADERS)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from drf_yasg import openapi
+
+from core.metrics import registry
+from core.models import IdempotencyRecord
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+idempotency_key_parameter = openapi.Parameter(
+    IDEMPOTENCY_HEADER, openapi.IN_HEADER, type=openapi.TYPE_STRING,
+    description="Client-chosen unique key. Retries with the same key and body get the first response back instead of repeating the request.",
+)
+
+registry.describe('ministore_idempotent_requests_total', 'Requests carrying an Idempotency-Key, by view and outcome.')
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still being processed.'
+    default_code = 'idempotency_conflict'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used with a different request body.'
+    default_code = 'idempotency_key_reused'
+
+
+def fingerprint(data):
+    return hashlib.sha256(json.dumps(data, cls=JSONEncoder, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Makes POST replayable with an `Idempotency-Key` header. The first
+    response (status and body) is stored per user, view and key in the
+    `idempotency_keys` table for `settings.IDEMPOTENCY_TTL` seconds and
+    returned on retries without running the view again. The row is claimed
+    before the view runs, so concurrent duplicates on any worker cannot both
+    get through; one that arrives while the first request is still running
+    waits for it, then gets 409 if it has not finished. Errors raised by the
+    view (validation failures, server errors) are not stored, so those
+    requests can be retried for real.
+    """
+    idempotency_wait_seconds = 2.0
+    idempotency_poll_interval = 0.05
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return super().post(request, *args, **kwargs)
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({IDEMPOTENCY_HEADER: f'Must be 1 to {MAX_KEY_LENGTH} characters.'})
+
+        view_name = type(self).__name__
+        lookup = {'user': request.user, 'view': view_name, 'key': hashlib.sha256(key.encode()).hexdigest()}
+        body = fingerprint(request.data)
+
+        record = self.claim(lookup, body)
+        if record is None:
+            return self.run_and_store(lookup, view_name, request, *args, **kwargs)
+        if record.status_code is None:
+            record = self.wait_for_response(record)
+        if record.fingerprint != body:
+            registry.increment('ministore_idempotent_requests_total', labels={'view': view_name, 'outcome': 'mismatch'})
+            raise IdempotencyKeyReused()
+        registry.increment('ministore_idempotent_requests_total', labels={'view': view_name, 'outcome': 'replayed'})
+        return Response(record.response, status=record.status_code, headers={REPLAYED_HEADER: 'true'})
+
+    def claim(self, lookup, body):
+        """
+        Insert the record for this key, returning None when this request now
+        owns it and should run the view, or the existing record otherwise.
+        Expired responses and claims abandoned by a crashed request are taken
+        over with a compare-and-set on `created_at`.
+        """
+        for _ in range(2):
+            record = IdempotencyRecord.objects.filter(**lookup).first()
+            if record is None:
+                try:
+                    with transaction.atomic():
+                        IdempotencyRecord.objects.create(fingerprint=body, **lookup)
+                    return None
+                except IntegrityError:
+                    continue  # another request claimed the key first; read its record
+            if not record.is_stale:
+                return record
+            taken_over = IdempotencyRecord.objects.filter(pk=record.pk, created_at=record.created_at).update(
+                fingerprint=body, status_code=None, response=None, created_at=timezone.now()
+            )
+            if taken_over:
+                return None
+        raise IdempotencyConflict()
+
+    def run_and_store(self, lookup, view_name, request, *args, **kwargs):
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception:
+            IdempotencyRecord.objects.filter(**lookup).delete()
+            raise
+        if response.status_code < 500:
+            IdempotencyRecord.objects.filter(**lookup).update(status_code=response.status_code, response=response.data)
+            registry.increment('ministore_idempotent_requests_total', labels={'view': view_name, 'outcome': 'stored'})
+        else:
+            IdempotencyRecord.objects.filter(**lookup).delete()
+        return response
+
+    def wait_for_response(self, record):
+        deadline = time.monotonic() + self.idempotency_wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(self.idempotency_poll_interval)
+            current = IdempotencyRecord.objects.filter(pk=record.pk).first()
+            if current is None:
+                break  # the first request failed and released the key
+            if current.status_code is not None:
+                return current
+        raise IdempotencyConflict()
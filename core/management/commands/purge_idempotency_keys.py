@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.models import IdempotencyRecord
+
+
+class Command(BaseCommand):
+    help = "Delete stored Idempotency-Key responses older than IDEMPOTENCY_TTL."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyRecord.objects.expired().delete()
+        self.stdout.write(f"Deleted {deleted} expired idempotency records")
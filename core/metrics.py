@@ -0,0 +1,154 @@
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+from time import perf_counter
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+current_sample = ContextVar('current_request_sample', default=None)
+
+
+class RequestSample:
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_started = None
+        self.render_seconds = 0.0
+        self.wall_seconds = 0.0
+
+
+def observe_query(execute, sql, params, many, context):
+    """Database execute wrapper that charges queries to the current request."""
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.db_seconds += perf_counter() - started
+
+
+def install_query_observer(sender, connection, **kwargs):
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_query)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.budget_exceeded = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+    """Per-process request metrics, keyed by resolved URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(EndpointStats)
+        self._counters = defaultdict(int)
+        self._help = {}
+        self._collectors = []
+
+    def observe(self, endpoint, sample, over_budget=False):
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats.requests += 1
+            stats.queries += sample.queries
+            stats.db_seconds += sample.db_seconds
+            stats.render_seconds += sample.render_seconds
+            stats.wall_seconds += sample.wall_seconds
+            stats.budget_exceeded += int(over_budget)
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if sample.wall_seconds <= bound:
+                    stats.buckets[index] += 1
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def register_collector(self, collector):
+        """
+        Register a callable returning `{(name, ((label, value), ...)): count}`
+        that is read at scrape time, for counters kept elsewhere.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def increment(self, name, value=1, labels=None):
+        """Count events outside requests, e.g. rows processed by a job."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def endpoint(self, endpoint):
+        with self._lock:
+            return vars(self._endpoints[endpoint]).copy() if endpoint in self._endpoints else None
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._counters.clear()
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = {name: vars(stats).copy() for name, stats in self._endpoints.items()}
+            counters = dict(self._counters)
+        for collector in self._collectors:
+            counters.update(collector())
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        def labels(**values):
+            return ','.join(f'{key}="{value}"' for key, value in values.items())
+
+        family('ministore_http_requests_total', 'counter', 'Requests handled, by endpoint.', [
+            f'ministore_http_requests_total{{{labels(endpoint=name)}}} {stats["requests"]}'
+            for name, stats in endpoints.items()
+        ])
+        family('ministore_http_db_queries_total', 'counter', 'SQL queries run while handling requests.', [
+            f'ministore_http_db_queries_total{{{labels(endpoint=name)}}} {stats["queries"]}'
+            for name, stats in endpoints.items()
+        ])
+        family('ministore_http_db_seconds_total', 'counter', 'Time spent in SQL queries.', [
+            f'ministore_http_db_seconds_total{{{labels(endpoint=name)}}} {stats["db_seconds"]:.6f}'
+            for name, stats in endpoints.items()
+        ])
+        family('ministore_http_render_seconds_total', 'counter', 'Time spent rendering response bodies.', [
+            f'ministore_http_render_seconds_total{{{labels(endpoint=name)}}} {stats["render_seconds"]:.6f}'
+            for name, stats in endpoints.items()
+        ])
+        family('ministore_http_query_budget_exceeded_total', 'counter', 'Requests that ran more queries than their budget.', [
+            f'ministore_http_query_budget_exceeded_total{{{labels(endpoint=name)}}} {stats["budget_exceeded"]}'
+            for name, stats in endpoints.items()
+        ])
+        duration = []
+        for name, stats in endpoints.items():
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                duration.append(f'ministore_http_request_duration_seconds_bucket{{{labels(endpoint=name, le=bound)}}} {count}')
+            duration.append(f'ministore_http_request_duration_seconds_bucket{{{labels(endpoint=name, le="+Inf")}}} {stats["requests"]}')
+            duration.append(f'ministore_http_request_duration_seconds_sum{{{labels(endpoint=name)}}} {stats["wall_seconds"]:.6f}')
+            duration.append(f'ministore_http_request_duration_seconds_count{{{labels(endpoint=name)}}} {stats["requests"]}')
+        family('ministore_http_request_duration_seconds', 'histogram', 'Wall time per request.', duration)
+
+        by_name = defaultdict(list)
+        for (name, label_items), value in sorted(counters.items()):
+            by_name[name].append(f'{name}{{{labels(**dict(label_items))}}} {value}')
+        for name, samples in by_name.items():
+            family(name, 'counter', self._help.get(name, name), samples)
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,76 @@
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import RequestSample, current_sample, registry
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, DB time, response rendering time and wall time for
+    every request, keyed by the resolved URL name. The numbers are added to
+    the response as a `Server-Timing` header and aggregated for `/metrics`.
+    Requests that exceed their entry in `settings.QUERY_BUDGETS` are logged.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        return self.finish(request, response, sample)
+
+    async def __acall__(self, request):
+        sample, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        return self.finish(request, response, sample)
+
+    def start(self, request):
+        sample = RequestSample()
+        request.metrics_sample = sample
+        return sample, current_sample.set(sample)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        request.metrics_sample.render_started = perf_counter()
+        return response
+
+    def finish(self, request, response, sample):
+        finished = perf_counter()
+        sample.wall_seconds = finished - sample.started
+        if sample.render_started is not None:
+            sample.render_seconds = finished - sample.render_started
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.url_name if match and match.url_name else 'unmatched'
+        budget = settings.QUERY_BUDGETS.get(endpoint)
+        over_budget = budget is not None and sample.queries > budget
+        if over_budget:
+            logger.warning(
+                "%s ran %d queries, over its budget of %d", endpoint, sample.queries, budget
+            )
+        registry.observe(endpoint, sample, over_budget=over_budget)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sample.db_seconds * 1000:.3f};desc="{sample.queries} queries"',
+            f'render;dur={sample.render_seconds * 1000:.3f}',
+            f'total;dur={sample.wall_seconds * 1000:.3f}',
+        ])
+        return response
@@ -0,0 +1,65 @@
+from rest_framework.exceptions import ValidationError
+
+
+class FieldProjectionMixin:
+    """
+    Lets list endpoints take `?fields=a,b,c` and only load and serialize
+    those columns. The view's serializer must accept a `fields` argument
+    (see `core.serializers.DynamicFieldsModelSerializer`).
+    """
+    fields_query_param = 'fields'
+    # Columns always loaded because pagination or the URL depends on them.
+    projection_required_fields = ()
+
+    def get_requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self.parse_requested_fields()
+        return self._requested_fields
+
+    def parse_requested_fields(self):
+        if self.request is None or self.request.method != 'GET':
+            return None
+        raw = self.request.query_params.get(self.fields_query_param)
+        if not raw:
+            return None
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        available = self.get_serializer_class()().fields
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValidationError({self.fields_query_param: f"Unknown fields: {', '.join(unknown)}"})
+        return requested
+
+    def project_queryset(self, queryset):
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = [name for name in fields if name in model_fields]
+        ordering = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', None) or ()]
+        return queryset.only(*dict.fromkeys(columns + list(self.projection_required_fields) + ordering))
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class KeysetSortMixin:
+    """
+    Lets keyset-paginated list endpoints take `?sort=<name>`, picked from a
+    whitelist of orderings. Each ordering must end in a unique field and
+    should be backed by an index.
+    """
+    sort_query_param = 'sort'
+    sort_options = {}
+    default_sort = None
+
+    @property
+    def keyset_ordering(self):
+        sort = self.default_sort
+        if self.request is not None:
+            sort = self.request.query_params.get(self.sort_query_param) or sort
+        if sort not in self.sort_options:
+            raise ValidationError({self.sort_query_param: f"Unknown sort. Choose one of: {', '.join(self.sort_options)}"})
+        return self.sort_options[sort]
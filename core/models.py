@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class IdempotencyRecordQuerySet(models.QuerySet):
+    def expired(self):
+        return self.filter(created_at__lt=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_TTL))
+
+
+class IdempotencyRecord(models.Model):
+    """
+    First response to a POST sent with an `Idempotency-Key`. The row is
+    inserted before the view runs, so the unique constraint lets exactly one
+    request per user, view and key through; `status_code` stays null until
+    that request finishes.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    view = models.CharField(max_length=100)
+    key = models.CharField(max_length=64, help_text="SHA-256 of the Idempotency-Key header.")
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=JSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = IdempotencyRecordQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.view} {self.key[:12]} ({self.status_code or 'running'})"
+
+    @property
+    def is_stale(self):
+        """Expired, or claimed by a request that died before finishing."""
+        age = (timezone.now() - self.created_at).total_seconds()
+        if self.status_code is None:
+            return age > settings.IDEMPOTENCY_LOCK_TIMEOUT
+        return age > settings.IDEMPOTENCY_TTL
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = "Idempotency Record"
+        verbose_name_plural = "Idempotency Records"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'view', 'key'], name='unique_idempotency_key'),
+        ]
@@ -0,0 +1,147 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination over a unique, indexed ordering.
+
+    The cursor encodes the ordering values of the last row of a page, so the
+    next page is a range scan (`WHERE (a, b) < (x, y) ORDER BY a, b LIMIT n`)
+    whose cost does not depend on how deep into the result set it starts.
+    The last ordering field must be unique (usually the primary key).
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-pk')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, request, view=None):
+        return tuple(getattr(view, 'keyset_ordering', None) or self.ordering)
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+            except (KeyError, ValueError):
+                return self.page_size
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering_fields(self):
+        return [field.lstrip('-') for field in self.ordering_fields]
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the lazily evaluated queryset for one page (plus one lookahead
+        row). Splitting this from `build_page` lets async views evaluate it
+        with `async for`.
+        """
+        self.request = request
+        self.ordering_fields = self.get_ordering(request, view)
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering_fields)
+        if position is not None:
+            position = self.clean_position(queryset.model, position)
+            queryset = queryset.filter(self.get_position_filter(position))
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, rows):
+        rows = list(rows)
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.build_page(self.get_page_queryset(queryset, request, view))
+
+    def get_position_filter(self, position):
+        condition = Q()
+        for index, field in enumerate(self.ordering_fields):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': position[index]})
+            for previous, value in zip(self.get_ordering_fields()[:index], position):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def clean_position(self, model, position):
+        # A cursor taken under a different ordering must not reach the database.
+        cleaned = []
+        for name, value in zip(self.get_ordering_fields(), position):
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            try:
+                cleaned.append(field.to_python(value))
+            except (DjangoValidationError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def get_position(self, row):
+        position = []
+        for name in self.get_ordering_fields():
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            position.append(str(value))
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering_fields):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        return urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,54 @@
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin that fails when a request runs more SQL queries than the
+    budget declared for its URL name in `settings.QUERY_BUDGETS`.
+    """
+
+    def assertWithinQueryBudget(self, method, path, data=None, **extra):
+        url_name = resolve(urlsplit(path).path).url_name
+        if url_name not in settings.QUERY_BUDGETS:
+            self.fail(f"No query budget declared for {url_name!r} in QUERY_BUDGETS.")
+        budget = settings.QUERY_BUDGETS[url_name]
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(path, data, **extra)
+        if len(queries) > budget:
+            statements = '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(queries, start=1))
+            self.fail(f"{url_name} ran {len(queries)} queries, over its budget of {budget}:\n{statements}")
+        return response
+
+
+class QueryPlanMixin:
+    """
+    TestCase mixin asserting that a queryset is answered from an index
+    rather than a full table scan, using the backend's EXPLAIN output.
+    PostgreSQL is told to avoid sequential scans, since on a test-sized table
+    it would pick one even when a usable index exists.
+    """
+    full_scan_markers = {
+        'sqlite': re.compile(r'\bSCAN (?!.*\bUSING\b)'),
+        'postgresql': re.compile(r'\bSeq Scan\b'),
+    }
+
+    def get_query_plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index=None):
+        plan = self.get_query_plan(queryset)
+        marker = self.full_scan_markers.get(connection.vendor)
+        if marker and any(marker.search(line) for line in plan.splitlines()):
+            self.fail(f"Query scans a whole table:\n{queryset.query}\n{plan}")
+        if index is not None and index not in plan:
+            self.fail(f"Query does not use index {index}:\n{queryset.query}\n{plan}")
+        return plan
@@ -0,0 +1,126 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from carts.models import Cart, CartItem
+from orders.models import Order
+from payments.models import Payment
+from products.models.product_models import Products
+from products.services import cache_services
+
+from .metrics import registry
+from .testing import QueryBudgetMixin, QueryPlanMixin
+
+User = get_user_model()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite connection settings')
+class SQLiteConnectionTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+    def test_transactions_are_immediate(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+class RequestMetricsMiddlewareTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        cache_services.stats.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        Products.objects.create(name='Metered', price=1, created_by=self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/products/products/')
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('render;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_metrics_recorded_per_url_name(self):
+        self.client.get('/products/products/')
+        self.client.get('/products/products/?page_size=1')
+        stats = registry.endpoint('product-list-create')
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['queries'], 2)
+        self.assertGreater(stats['wall_seconds'], 0)
+
+    def test_async_view_queries_counted(self):
+        self.client.get('/products/async/products/')
+        self.assertEqual(registry.endpoint('product-list-async')['queries'], 1)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/products/products/')
+        self.client.get('/products/products/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('ministore_http_requests_total{endpoint="product-list-create"} 2', body)
+        self.assertIn('ministore_http_db_queries_total{endpoint="product-list-create"} 1', body)
+        self.assertIn('ministore_http_request_duration_seconds_count{endpoint="product-list-create"} 2', body)
+        self.assertIn('ministore_product_cache_requests_total{kind="list",result="hit"} 1', body)
+
+    @override_settings(QUERY_BUDGETS={'product-list-create': 0})
+    def test_over_budget_request_counted(self):
+        with self.assertLogs('core.middleware', level='WARNING'):
+            self.client.get('/products/products/')
+        self.assertEqual(registry.endpoint('product-list-create')['budget_exceeded'], 1)
+
+    @override_settings(QUERY_BUDGETS={'product-list-create': 0})
+    def test_budget_helper_fails_over_budget(self):
+        with self.assertRaises(AssertionError) as context, self.assertLogs('core.middleware', level='WARNING'):
+            self.assertWithinQueryBudget('get', '/products/products/')
+        self.assertIn('over its budget of 0', str(context.exception))
+
+    def test_budget_helper_requires_declared_budget(self):
+        with self.assertRaises(AssertionError):
+            self.assertWithinQueryBudget('get', '/orders/list/')
+
+
+class HotPathIndexTest(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([User(email=f'shopper{i}@example.com') for i in range(20)])
+        products = Products.objects.bulk_create([
+            Products(name=f'Product {i}', price=Decimal('1.00'), quantity=10, created_by=users[0]) for i in range(10)
+        ])
+        carts = Cart.objects.bulk_create([Cart(user=users[i % len(users)]) for i in range(200)])
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, quantity=1) for cart in carts for product in products[:3]
+        ])
+        Order.objects.bulk_create([
+            Order(cart=cart, payment_status='paid' if i % 10 else 'pending') for i, cart in enumerate(carts)
+        ])
+        Payment.objects.bulk_create([Payment(cart=cart, amount=Decimal('3.00')) for cart in carts])
+        cls.user, cls.cart, cls.product = users[0], carts[0], products[0]
+
+    def test_latest_cart_of_user(self):
+        self.assertUsesIndex(Cart.objects.filter(user=self.user).order_by('-created_at')[:1], 'cart_user_created_idx')
+
+    def test_cart_line_lookup(self):
+        self.assertUsesIndex(CartItem.objects.filter(cart=self.cart, product=self.product))
+
+    def test_payments_of_cart(self):
+        self.assertUsesIndex(Payment.objects.filter(cart=self.cart).order_by('created_at'), 'payments_cart_created_idx')
+
+    def test_orders_by_payment_status(self):
+        self.assertUsesIndex(Order.objects.filter(payment_status='pending'), 'orders_payment_status_idx')
+
+    def test_duplicate_cart_line_rejected(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
@@ -7,5 +7,5 @@ python manage.py collectstatic --noinput
 echo "🔄 Applying database migrations..."
 python manage.py migrate
 
-echo "🚀 Starting Gunicorn server..."
-exec gunicorn config.wsgi:application -c /app/gunicorn.conf.py
\ No newline at end of file
+echo "🚀 Starting Gunicorn server (${SERVER_MODE:-wsgi})..."
+exec gunicorn -c /app/gunicorn.conf.py
\ No newline at end of file
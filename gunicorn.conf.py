@@ -1,9 +1,18 @@
+import os
+
+# Server mode: "wsgi" runs config.wsgi on sync workers, "asgi" runs
+# config.asgi on uvicorn workers so the async views can overlap DB waits.
+server_mode = os.environ.get("SERVER_MODE", "wsgi")
+
 # Network binding
-bind = "0.0.0.0:8000"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Application
+wsgi_app = "config.asgi:application" if server_mode == "asgi" else "config.wsgi:application"
 
 # Worker settings
-workers = 4
-worker_class = "sync"
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+worker_class = "uvicorn_worker.UvicornWorker" if server_mode == "asgi" else "sync"
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 100
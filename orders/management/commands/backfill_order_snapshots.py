@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.services import backfill_order_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write order_items rows and Order.total_amount for orders placed before snapshots existed, "
+        "one transaction per chunk. Safe to re-run; finished orders are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        done = 0
+        for count in backfill_order_snapshots(batch_size=options['batch_size']):
+            done += count
+            self.stdout.write(f"Snapshotted {done} orders")
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled {done} orders in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0003_cart_indexes_and_unique_items'),
+        ('orders', '0002_order_item_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['payment_status'], name='orders_payment_status_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import uuid
+
 from django.db import models
 from carts.models import Cart
+from carts.services import get_cart_totals
+from products.models.product_models import Products
 
 class Order(models.Model):
     cart = models.OneToOneField(Cart, on_delete=models.CASCADE, related_name='order', primary_key=True)
@@ -9,15 +13,38 @@ class Order(models.Model):
         ('failed', 'Failed')
     ], default='pending')
     checkout_time = models.DateTimeField(auto_now_add=True)
+    # Written at checkout from the OrderItem snapshot; null only for orders
+    # placed before snapshots existed and not yet backfilled.
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
 
     class Meta:
         db_table = 'orders'
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        indexes = [
+            models.Index(fields=['payment_status'], name='orders_payment_status_idx'),
+        ]
 
     def __str__(self):
-        return f"Order for cart {self.cart.cart_id} - {self.payment_status}"
+        return f"Order for cart {self.cart_id} - {self.payment_status}"
     
     def get_total_price(self):
-        total = sum(item.product.price * item.quantity for item in self.cart.items.all())
-        return total
\ No newline at end of file
+        if self.total_amount is not None:
+            return self.total_amount
+        return get_cart_totals(self.cart_id).total
+
+class OrderItem(models.Model):
+    """A cart line as it was at checkout, so later price or name changes do not rewrite history."""
+    id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    position = models.PositiveSmallIntegerField(default=0)
+    product = models.ForeignKey(Products, on_delete=models.SET_NULL, null=True, related_name='+')
+    product_name = models.CharField(max_length=255)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+    line_total = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        db_table = 'order_items'
+        verbose_name = "Order Item"
+        verbose_name_plural = "Order Items"
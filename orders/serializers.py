@@ -1,6 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Order
+from .models import Order, OrderItem
+from .services import build_order_items, cart_snapshot_rows
 from carts.models import Cart
+from products.services.inventory_services import InsufficientStock, reserve_stock
 
 class OrderSerializer(serializers.ModelSerializer):
     cart_id = serializers.UUIDField(source='cart.cart_id', read_only=True)  # <-- read-only for response
@@ -14,20 +17,46 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         cart_id = validated_data.pop('input_cart_id')
         cart = Cart.objects.get(cart_id=cart_id)
-        items = cart.items.select_related('product').all()
-        errors = []
-        # Check stock
-        for item in items:
-            if item.quantity > item.product.quantity:
-                errors.append(f"Not enough stock for {item.product.name} (requested: {item.quantity}, available: {item.product.quantity})")
-        if errors:
-            raise serializers.ValidationError({'detail': errors})
-        # Create order
-        order = Order.objects.create(cart=cart, payment_status='pending')
-        # Deduct stock
-        for item in items:
-            product = item.product
-            product.quantity -= item.quantity
-            product.save()
+        with transaction.atomic():
+            # Reserve stock, create the order and snapshot its lines together,
+            # so a failed order (e.g. a duplicate for this cart) gives the
+            # stock back.
+            rows = list(cart_snapshot_rows([cart.cart_id]))
+            try:
+                reserve_stock({row['product_id']: row['quantity'] for row in rows})
+            except InsufficientStock as exc:
+                raise serializers.ValidationError({'detail': exc.messages()})
+            items, totals = build_order_items(rows)
+            order = Order.objects.create(cart=cart, payment_status='pending', total_amount=totals[cart.cart_id])
+            OrderItem.objects.bulk_create(items)
         return order
-    
\ No newline at end of file
+
+
+class OrderLineSerializer(serializers.ModelSerializer):
+    product_id = serializers.UUIDField(read_only=True)
+    name = serializers.CharField(source='product_name', read_only=True)
+    price = serializers.DecimalField(source='unit_price', max_digits=10, decimal_places=2, read_only=True)
+    subtotal = serializers.DecimalField(source='line_total', max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ['product_id', 'name', 'price', 'quantity', 'subtotal']
+        read_only_fields = fields
+
+
+class OrderDetailSerializer(serializers.ModelSerializer):
+    cart_id = serializers.UUIDField(read_only=True)
+    items = OrderLineSerializer(many=True, read_only=True)
+    line_count = serializers.SerializerMethodField()
+    item_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ['cart_id', 'payment_status', 'checkout_time', 'total_amount', 'line_count', 'item_count', 'items']
+        read_only_fields = fields
+
+    def get_line_count(self, order):
+        return len(order.items.all())
+
+    def get_item_count(self, order):
+        return sum(item.quantity for item in order.items.all())
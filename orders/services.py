@@ -0,0 +1,89 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Min, Prefetch, Sum
+
+from carts.models import CartItem
+from carts.services import get_cart_totals
+
+from .models import Order, OrderItem
+
+
+def cart_snapshot_rows(cart_ids):
+    """
+    One row per (cart, product) with the summed quantity and the product's
+    current name and price, in the order products were first added.
+    """
+    return (
+        CartItem.objects.filter(cart_id__in=cart_ids)
+        .order_by()
+        .values('cart_id', 'product_id', 'product__name', 'product__price')
+        .annotate(quantity=Sum('quantity'), first_added=Min('added_at'))
+        .order_by('cart_id', 'first_added')
+    )
+
+
+def build_order_items(rows):
+    """Turn snapshot rows into unsaved OrderItems and per-cart totals."""
+    items = []
+    totals = defaultdict(lambda: Decimal('0.00'))
+    positions = defaultdict(int)
+    for row in rows:
+        line_total = row['product__price'] * row['quantity']
+        positions[row['cart_id']] += 1
+        items.append(OrderItem(
+            order_id=row['cart_id'],
+            position=positions[row['cart_id']],
+            product_id=row['product_id'],
+            product_name=row['product__name'],
+            unit_price=row['product__price'],
+            quantity=row['quantity'],
+            line_total=line_total,
+        ))
+        totals[row['cart_id']] += line_total
+    return items, totals
+
+
+def get_payable_total(cart):
+    """The stored order total once `cart` is checked out, else its live total."""
+    try:
+        total = cart.order.total_amount
+    except Order.DoesNotExist:
+        total = None
+    return total if total is not None else get_cart_totals(cart.cart_id).total
+
+
+def orders_with_lines(user):
+    """A user's orders with their snapshot lines prefetched: two queries for any number of orders."""
+    return (
+        Order.objects.filter(cart__user=user)
+        .prefetch_related(Prefetch('items', queryset=OrderItem.objects.order_by('position')))
+    )
+
+
+def backfill_order_snapshots(batch_size=500):
+    """
+    Snapshot orders placed before OrderItem existed, `batch_size` orders per
+    transaction in primary-key order. Prices come from the products as they
+    are now, the best that is still known. Yields the size of each chunk.
+    """
+    last_cart_id = None
+    while True:
+        pending = Order.objects.filter(total_amount__isnull=True).order_by('cart_id')
+        if last_cart_id is not None:
+            pending = pending.filter(cart_id__gt=last_cart_id)
+        cart_ids = list(pending.values_list('cart_id', flat=True)[:batch_size])
+        if not cart_ids:
+            return
+        with transaction.atomic():
+            items, totals = build_order_items(cart_snapshot_rows(cart_ids))
+            OrderItem.objects.filter(order_id__in=cart_ids).delete()
+            OrderItem.objects.bulk_create(items, batch_size=batch_size)
+            Order.objects.bulk_update(
+                [Order(cart_id=cart_id, total_amount=totals[cart_id]) for cart_id in cart_ids],
+                ['total_amount'],
+                batch_size=batch_size,
+            )
+        last_cart_id = cart_ids[-1]
+        yield len(cart_ids)
@@ -1,11 +1,17 @@
-from django.test import TestCase
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIRequestFactory
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework.request import Request
 from rest_framework import serializers
 import uuid
 from .serializers import OrderSerializer
-from .models import Order
+from .models import Order, OrderItem
+from .services import backfill_order_snapshots
+from core.testing import QueryBudgetMixin
 from carts.models import Cart, CartItem
 from products.models.product_models import Products
 
@@ -93,3 +99,205 @@ class OrderSerializerTest(TestCase):
         self.assertEqual(data['payment_status'], 'pending')
         self.assertIsNotNone(data['checkout_time'])
         self.assertNotIn('input_cart_id', data)
+
+
+class AsyncListOrderViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.orders = [Order.objects.create(cart=Cart.objects.create(user=self.user)) for _ in range(3)]
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        Order.objects.create(cart=Cart.objects.create(user=other))
+
+    def test_lists_only_own_orders(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/orders/async/list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {order['cart_id'] for order in response.json()},
+            {str(order.cart_id) for order in self.orders}
+        )
+
+
+class OrderHistoryViewTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.products = [
+            Products.objects.create(name=f'Product {i}', price=i + 1, quantity=100, created_by=self.user)
+            for i in range(3)
+        ]
+        for _ in range(30):
+            cart = Cart.objects.create(user=self.user)
+            CartItem.objects.bulk_create([
+                CartItem(cart=cart, product=product, quantity=index + 1)
+                for index, product in enumerate(self.products)
+            ])
+            Order.objects.create(cart=cart)
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.other_order = Order.objects.create(cart=Cart.objects.create(user=other))
+        self.assertEqual(sum(backfill_order_snapshots(batch_size=7)), 31)
+
+    def test_history_pages_in_fixed_queries(self):
+        seen = []
+        url = '/orders/history/?page_size=12'
+        while url:
+            response = self.assertWithinQueryBudget('get', url)
+            self.assertEqual(response.status_code, 200)
+            seen += response.data['results']
+            url = response.data['next']
+        self.assertEqual(len(seen), 30)
+        self.assertNotIn(str(self.other_order.cart_id), {order['cart_id'] for order in seen})
+        times = [order['checkout_time'] for order in seen]
+        self.assertEqual(times, sorted(times, reverse=True))
+
+        order = seen[0]
+        # 1*1 + 2*2 + 3*3
+        self.assertEqual(order['total_amount'], '14.00')
+        self.assertEqual((order['line_count'], order['item_count']), (3, 6))
+        self.assertEqual([line['name'] for line in order['items']], ['Product 0', 'Product 1', 'Product 2'])
+        self.assertEqual(order['items'][2]['subtotal'], '9.00')
+
+    def test_detail(self):
+        order = Order.objects.filter(cart__user=self.user).first()
+        response = self.assertWithinQueryBudget('get', f'/orders/{order.cart_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 3)
+        self.assertEqual(self.client.get(f'/orders/{self.other_order.cart_id}/').status_code, 404)
+
+    def test_str_does_not_load_cart(self):
+        order = Order.objects.get(pk=self.other_order.pk)
+        with self.assertNumQueries(0):
+            self.assertIn(str(order.cart_id), str(order))
+
+
+class OrderSnapshotTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.product = Products.objects.create(name='Test Product', price=10, quantity=10, created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=3)
+
+    def checkout(self):
+        request = self.factory.post('/')
+        request.user = self.user
+        serializer = OrderSerializer(data={'input_cart_id': str(self.cart.cart_id)}, context={'request': Request(request)})
+        self.assertTrue(serializer.is_valid())
+        return serializer.save()
+
+    def test_checkout_snapshots_lines_and_total(self):
+        order = self.checkout()
+        self.assertEqual(order.total_amount, 30)
+        item = order.items.get()
+        self.assertEqual((item.product_name, item.unit_price, item.quantity, item.line_total), ('Test Product', 10, 3, 30))
+
+    def test_history_survives_price_changes_and_deletes(self):
+        order = self.checkout()
+        Products.objects.filter(pk=self.product.pk).update(price=99, name='Renamed')
+        order.refresh_from_db()
+        self.assertEqual(order.get_total_price(), 30)
+        self.assertEqual(order.items.get().product_name, 'Test Product')
+        self.product.delete()
+        self.assertEqual(OrderItem.objects.get().line_total, 30)
+
+    def test_backfill_skips_snapshotted_orders(self):
+        self.checkout()
+        self.assertEqual(list(backfill_order_snapshots()), [])
+
+
+class IdempotentCheckoutTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.product = Products.objects.create(name='Test Product', price=10, quantity=10, created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=self.product, quantity=2)
+
+    def checkout(self, key, cart_id=None):
+        return self.client.post(
+            '/orders/create/', {'input_cart_id': str(cart_id or self.cart.cart_id)}, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.checkout('checkout-1')
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(1):
+            retry = self.checkout('checkout-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 8)
+
+    def test_new_key_runs_the_view_again(self):
+        self.checkout('checkout-1')
+        response = self.checkout('checkout-2')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_key_reused_with_other_body_is_rejected(self):
+        self.checkout('checkout-1')
+        self.assertEqual(self.checkout('checkout-1', cart_id=uuid.uuid4()).status_code, 422)
+
+
+class ConcurrentCheckoutTest(TransactionTestCase):
+    workers = 8
+    checkouts = 40
+    stock = 25
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@example.com',
+            password='testpass123'
+        )
+        self.product = Products.objects.create(
+            name='Hot SKU',
+            price=5,
+            quantity=self.stock,
+            created_by=self.owner
+        )
+        self.carts = []
+        for i in range(self.checkouts):
+            user = User.objects.create_user(email=f'buyer{i}@example.com')
+            cart = Cart.objects.create(user=user)
+            CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+            self.carts.append(cart)
+
+    def checkout(self, cart):
+        # Django's in-memory test database uses SQLite's shared cache, where a
+        # table lock fails at once instead of waiting on busy_timeout. Only
+        # that error is retried; anything else fails the test.
+        deadline = time.monotonic() + 30
+        try:
+            serializer = OrderSerializer(data={'input_cart_id': str(cart.cart_id)})
+            serializer.is_valid(raise_exception=True)
+            while True:
+                try:
+                    serializer.save()
+                    return True
+                except OperationalError as exc:
+                    if 'table is locked' not in str(exc) or time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.001)
+        except serializers.ValidationError:
+            return False
+        finally:
+            connection.close()
+
+    def test_parallel_checkouts_never_oversell(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.checkout, self.carts))
+
+        self.product.refresh_from_db()
+        self.assertEqual(results.count(True), self.stock)
+        self.assertEqual(self.product.quantity, 0)
+        self.assertEqual(Order.objects.count(), self.stock)
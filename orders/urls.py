@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import CreateOrderView, ListOrderView, DeleteOrderView
+from .views import CreateOrderView, ListOrderView, DeleteOrderView, AsyncListOrderView, OrderHistoryView, OrderDetailView
 
 urlpatterns = [
     path('create/', CreateOrderView.as_view(), name='create-order'),
     path('list/', ListOrderView.as_view(), name='list-orders'),
+    path('async/list/', AsyncListOrderView.as_view(), name='list-orders-async'),
+    path('history/', OrderHistoryView.as_view(), name='order-history'),
+    path('<uuid:pk>/', OrderDetailView.as_view(), name='order-detail'),
     path('delete/<uuid:pk>/', DeleteOrderView.as_view(), name='delete-order'),
 ]
\ No newline at end of file
@@ -1,14 +1,28 @@
 from django.db import IntegrityError
 from rest_framework import generics, permissions, serializers
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
 from carts.models import Cart
+from core.async_views import AsyncAPIView
+from core.idempotency import IdempotentCreateMixin, idempotency_key_parameter
+from core.pagination import KeysetPagination
 from .models import Order
-from .serializers import OrderSerializer
+from .serializers import OrderDetailSerializer, OrderSerializer
+from .services import orders_with_lines
 
 
-class CreateOrderView(generics.CreateAPIView):
+class CreateOrderView(IdempotentCreateMixin, generics.CreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @swagger_auto_schema(
+        operation_description="Place an order for your latest cart",
+        manual_parameters=[idempotency_key_parameter],
+        responses={201: OrderSerializer}
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
@@ -34,6 +48,51 @@ class ListOrderView(generics.ListAPIView):
         user = self.request.user
         return Order.objects.filter(cart__user=user)
     
+class AsyncListOrderView(AsyncAPIView):
+    serializer_class = OrderSerializer
+
+    async def get(self, request, *args, **kwargs):
+        orders = Order.objects.filter(cart__user=request.user).select_related('cart')
+        return self.json_response(OrderSerializer([order async for order in orders], many=True).data)
+
+class OrderHistoryView(generics.ListAPIView):
+    serializer_class = OrderDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-checkout_time', '-cart_id')
+
+    @swagger_auto_schema(
+        operation_description="Your orders, newest first, with their line items and totals",
+        manual_parameters=[
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, description="Opaque cursor taken from the previous page's `next` link", type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY, description="Number of orders per page", type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={200: OrderDetailSerializer(many=True)}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return orders_with_lines(self.request.user)
+
+class OrderDetailView(generics.RetrieveAPIView):
+    serializer_class = OrderDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="One of your orders with its line items and totals",
+        responses={200: OrderDetailSerializer}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return orders_with_lines(self.request.user)
+
 class DeleteOrderView(generics.DestroyAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
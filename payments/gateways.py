@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class PaymentDeclined(Exception):
+    """The payment was refused; retrying will not help."""
+
+
+class GatewayUnavailable(Exception):
+    """The gateway could not settle the payment right now; retry later."""
+
+
+class LocalGateway:
+    """
+    Stand-in for a real payment provider, used in development and tests.
+    Approves every payment. Real gateways must send `idempotency_key` (the
+    payment id) to the provider so that charging the same payment twice
+    settles it once.
+    """
+
+    def charge(self, payment, idempotency_key):
+        return None
+
+
+def get_gateway():
+    return import_string(settings.PAYMENT_GATEWAY)()
@@ -0,0 +1,34 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.services import process_payments
+
+
+class Command(BaseCommand):
+    help = (
+        "Settle queued payments and update their orders. Exits once no payment is due "
+        "unless --loop is given. Several workers can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new payments.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        while self.running:
+            counts = process_payments(batch_size=options['batch_size'])
+            if counts:
+                summary = ', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))
+                self.stdout.write(f"Processed {sum(counts.values())} payments ({summary})")
+            elif options['loop']:
+                time.sleep(options['poll_interval'])
+            else:
+                break
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:59
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def settle_existing_payments(apps, schema_editor):
+    # Payments made before the queue existed were applied on the spot; keep
+    # them out of the worker's queue and take their outcome from the order.
+    Payment = apps.get_model('payments', 'Payment')
+    Order = apps.get_model('orders', 'Order')
+    failed = Order.objects.filter(cart_id=OuterRef('cart_id'), payment_status='failed').values('payment_status')[:1]
+    Payment.objects.update(status=Coalesce(Subquery(failed), Value('paid')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0001_initial'),
+        ('orders', '0001_initial'),
+        ('payments', '0002_alter_payment_payment_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('paid', 'Paid'), ('failed', 'Failed')], default='pending', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(settle_existing_payments, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='payments_queue_idx'),
+        ),
+    ]
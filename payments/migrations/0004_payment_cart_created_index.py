@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0003_cart_indexes_and_unique_items'),
+        ('payments', '0003_payment_status_queue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['cart', 'created_at'], name='payments_cart_created_idx'),
+        ),
+    ]
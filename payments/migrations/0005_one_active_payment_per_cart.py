@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:04
+
+from django.db import migrations, models
+
+ACTIVE_STATUSES = ['pending', 'processing', 'paid']
+
+
+def fail_duplicate_payments(apps, schema_editor):
+    # Carts could be paid more than once before the constraint (retries, and
+    # 0003 marked every legacy payment paid). Keep the earliest active payment
+    # per cart and fail the rest so the unique constraint can be added.
+    Payment = apps.get_model('payments', 'Payment')
+    seen, duplicates = set(), []
+    active = Payment.objects.filter(status__in=ACTIVE_STATUSES).order_by('cart_id', 'created_at', 'payment_id')
+    for payment_id, cart_id in active.values_list('payment_id', 'cart_id').iterator():
+        if cart_id in seen:
+            duplicates.append(payment_id)
+        seen.add(cart_id)
+    for start in range(0, len(duplicates), 500):
+        Payment.objects.filter(payment_id__in=duplicates[start:start + 500]).update(
+            status='failed', last_error='Duplicate payment for this cart.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0003_cart_indexes_and_unique_items'),
+        ('payments', '0004_payment_cart_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_payments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ACTIVE_STATUSES)), fields=('cart',), name='payments_one_active_per_cart'),
+        ),
+    ]
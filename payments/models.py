@@ -1,17 +1,61 @@
 from django.db import models
+from django.utils import timezone
 from carts.models import Cart
 import uuid
 
+
+class InvalidTransition(Exception):
+    pass
+
+
 class Payment(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PROCESSING = 'processing', 'Processing'
+        PAID = 'paid', 'Paid'
+        FAILED = 'failed', 'Failed'
+
+    # A processing payment goes back to pending when a retry is scheduled.
+    TRANSITIONS = {
+        Status.PENDING: {Status.PROCESSING},
+        Status.PROCESSING: {Status.PAID, Status.FAILED, Status.PENDING},
+        Status.PAID: set(),
+        Status.FAILED: set(),
+    }
+    # A cart can only be paid once; a new payment is allowed after a failure.
+    ACTIVE_STATUSES = (Status.PENDING, Status.PROCESSING, Status.PAID)
+
     payment_id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='payments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'payments'
         verbose_name = "Payment"
         verbose_name_plural = "Payments"
+        indexes = [
+            # The worker's queue scan: due payments by status, oldest first.
+            models.Index(fields=['status', 'next_attempt_at'], name='payments_queue_idx'),
+            models.Index(fields=['cart', 'created_at'], name='payments_cart_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cart'],
+                condition=models.Q(status__in=['pending', 'processing', 'paid']),
+                name='payments_one_active_per_cart',
+            ),
+        ]
 
     def __str__(self):
-        return f"Payment {self.payment_id} for cart {self.cart.cart_id}"
\ No newline at end of file
+        return f"Payment {self.payment_id} for cart {self.cart_id} ({self.status})"
+
+    def transition_to(self, status):
+        if status not in self.TRANSITIONS[self.status]:
+            raise InvalidTransition(f"Payment {self.payment_id} cannot go from {self.status} to {status}.")
+        self.status = status
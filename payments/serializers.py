@@ -1,44 +1,48 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
 from .models import Payment
 from carts.models import Cart
+from orders.services import get_payable_total
 
 
 class PaymentSerializer(serializers.ModelSerializer):
     cart_id = serializers.UUIDField(write_only=True)
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
-    status = serializers.CharField(max_length=32)
 
     class Meta:
         model = Payment
-        fields = ['cart_id', 'amount', 'status', 'created_at']
-        read_only_fields = ['created_at']
+        fields = ['payment_id', 'cart_id', 'amount', 'status', 'last_error', 'created_at', 'updated_at']
+        read_only_fields = ['payment_id', 'status', 'last_error', 'created_at', 'updated_at']
 
     def validate(self, attrs):
         cart_id = attrs.get('cart_id')
         amount = attrs.get('amount')
         try:
-            cart = Cart.objects.get(cart_id=cart_id)
+            cart = Cart.objects.select_related('order').annotate(
+                has_active_payment=Exists(
+                    Payment.objects.filter(cart=OuterRef('pk'), status__in=Payment.ACTIVE_STATUSES)
+                )
+            ).get(cart_id=cart_id)
         except Cart.DoesNotExist:
             raise serializers.ValidationError("Cart not found.")
-        # Calculate total from cart
-        total = sum(item.product.price * item.quantity for item in cart.items.all())
+        if cart.has_active_payment:
+            raise serializers.ValidationError("This cart already has a pending or completed payment.")
+        total = get_payable_total(cart)
         if amount != total:
             raise serializers.ValidationError(f"Amount does not match cart total: {total}")
         attrs['cart'] = cart
         return attrs
 
     def create(self, validated_data):
-        cart = validated_data['cart']
-        amount = validated_data['amount']
-        status = validated_data['status']
-        payment = Payment.objects.create(cart=cart, amount=amount)
-        payment.status = status
-        payment.save()
-        # Update order status if exists
-        if hasattr(cart, 'order'):
-            cart.order.payment_status = status
-            cart.order.save()
-        return payment
+        # Only queue the payment; the process_payments worker settles it and
+        # updates the order.
+        try:
+            with transaction.atomic():
+                return Payment.objects.create(cart=validated_data['cart'], amount=validated_data['amount'])
+        except IntegrityError:
+            # A concurrent request queued a payment for the cart after validate().
+            raise serializers.ValidationError("This cart already has a pending or completed payment.")
 
 
 class CartTotalSerializer(serializers.Serializer):
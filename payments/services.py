@@ -0,0 +1,125 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.metrics import registry
+from orders.models import Order
+from .gateways import GatewayUnavailable, PaymentDeclined, get_gateway
+from .models import Payment
+
+logger = logging.getLogger(__name__)
+
+Status = Payment.Status
+
+registry.describe('ministore_payments_processed_total', 'Payments settled by the worker, by resulting status.')
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... capped at the max."""
+    delay = settings.PAYMENT_RETRY_BACKOFF * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.PAYMENT_RETRY_BACKOFF_MAX))
+
+
+def claim_payments(batch_size):
+    """
+    Take up to `batch_size` due payments off the queue and mark them
+    processing. SKIP LOCKED lets several workers claim disjoint batches
+    without waiting on each other. Payments stuck in processing longer than
+    PAYMENT_PROCESSING_TIMEOUT (a crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.PAYMENT_PROCESSING_TIMEOUT)
+    with transaction.atomic():
+        payment_ids = list(
+            Payment.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=Status.PENDING, next_attempt_at__lte=now) | Q(status=Status.PROCESSING, updated_at__lt=stale))
+            .order_by('next_attempt_at')
+            .values_list('payment_id', flat=True)[:batch_size]
+        )
+        if not payment_ids:
+            return []
+        Payment.objects.filter(payment_id__in=payment_ids).update(
+            status=Status.PROCESSING, attempts=F('attempts') + 1, updated_at=now
+        )
+    return list(Payment.objects.filter(payment_id__in=payment_ids))
+
+
+def renew_claim(payment):
+    """
+    Push the claim's `updated_at` forward right before charging, so a slow
+    batch is not reclaimed by another worker half way through. Returns False
+    when another worker has already reclaimed the payment, in which case
+    this one must not charge it.
+    """
+    now = timezone.now()
+    renewed = Payment.objects.filter(
+        payment_id=payment.payment_id, status=Status.PROCESSING, updated_at=payment.updated_at
+    ).update(updated_at=now)
+    payment.updated_at = now
+    return bool(renewed)
+
+
+def settle(payment, gateway):
+    try:
+        # The gateway dedupes on the key, so a payment charged again after a
+        # timeout or a reclaim is only settled once.
+        gateway.charge(payment, idempotency_key=str(payment.payment_id))
+    except PaymentDeclined as exc:
+        payment.transition_to(Status.FAILED)
+        payment.last_error = str(exc)
+    except Exception as exc:
+        if not isinstance(exc, GatewayUnavailable):
+            logger.exception("Unexpected error charging payment %s", payment.payment_id)
+        payment.last_error = str(exc) or type(exc).__name__
+        if payment.attempts >= settings.PAYMENT_MAX_ATTEMPTS:
+            payment.transition_to(Status.FAILED)
+        else:
+            payment.transition_to(Status.PENDING)
+            payment.next_attempt_at = timezone.now() + retry_delay(payment.attempts)
+    else:
+        payment.transition_to(Status.PAID)
+        payment.last_error = ''
+
+
+def process_payments(batch_size=100, gateway=None):
+    """
+    Settle one batch of queued payments and return how many reached each
+    status. Each claim is renewed just before its charge; the resulting
+    payment rows and the orders they settle are then written with one bulk
+    UPDATE per table rather than one per payment.
+    """
+    payments = claim_payments(batch_size)
+    if not payments:
+        return {}
+    gateway = gateway or get_gateway()
+    charged = []
+    for payment in payments:
+        if renew_claim(payment):
+            settle(payment, gateway)
+            charged.append(payment)
+    payments = charged
+    if not payments:
+        return {}
+
+    now = timezone.now()
+    for payment in payments:
+        payment.updated_at = now
+    settled = {status: [p.cart_id for p in payments if p.status == status] for status in (Status.PAID, Status.FAILED)}
+    with transaction.atomic():
+        Payment.objects.bulk_update(payments, ['status', 'next_attempt_at', 'last_error', 'updated_at'])
+        Order.objects.filter(cart_id__in=settled[Status.PAID]).update(payment_status=Status.PAID)
+        # A failed attempt never overrides an order that another payment already paid.
+        Order.objects.filter(cart_id__in=settled[Status.FAILED]).exclude(payment_status=Status.PAID).update(
+            payment_status=Status.FAILED
+        )
+
+    counts = {}
+    for payment in payments:
+        counts[payment.status] = counts.get(payment.status, 0) + 1
+    for status, count in counts.items():
+        registry.increment('ministore_payments_processed_total', count, labels={'status': status})
+    return counts
@@ -1,11 +1,27 @@
-from django.test import TestCase
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIRequestFactory
+from rest_framework.test import APIClient, APIRequestFactory
 import uuid
+from decimal import Decimal
+from unittest import mock
 from .serializers import PaymentSerializer, CartTotalSerializer
+from .gateways import GatewayUnavailable, PaymentDeclined
+from .models import InvalidTransition, Payment
+from .services import claim_payments, process_payments
+from .views import CreatePaymentView
 from carts.models import Cart, CartItem
 from products.models.product_models import Products
 from orders.models import Order
+from core.models import IdempotencyRecord
+from core.testing import QueryBudgetMixin
 
 User = get_user_model()
 
@@ -37,7 +53,7 @@ class PaymentSerializerTest(TestCase):
     def test_serializer_fields(self):
         """Test that serializer has correct fields"""
         serializer = PaymentSerializer()
-        expected_fields = {'cart_id', 'amount', 'status', 'created_at'}
+        expected_fields = {'payment_id', 'cart_id', 'amount', 'status', 'last_error', 'created_at', 'updated_at'}
         self.assertEqual(set(serializer.fields.keys()), expected_fields)
 
     def test_create_payment_success(self):
@@ -90,12 +106,34 @@ class PaymentSerializerTest(TestCase):
         serializer = PaymentSerializer(data=data)
         self.assertTrue(serializer.is_valid())
         payment = serializer.save()
-        
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'pending')
+        process_payments()
+
         # Verify order status was updated
         order.refresh_from_db()
         self.assertEqual(order.payment_status, 'paid')
         self.assertEqual(payment.cart, self.cart)
 
+    def test_validate_query_count_independent_of_cart_size(self):
+        """Test that validating a payment prices the cart in one aggregate"""
+        for i in range(50):
+            product = Products.objects.create(
+                name=f'Bulk Product {i}',
+                price=1,
+                quantity=100,
+                created_by=self.user
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=1)
+        data = {
+            'cart_id': str(self.cart.cart_id),
+            'amount': '71.98',
+            'status': 'paid'
+        }
+        serializer = PaymentSerializer(data=data)
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid())
+
 
 class CartTotalSerializerTest(TestCase):
     def setUp(self):
@@ -132,3 +170,256 @@ class CartTotalSerializerTest(TestCase):
         self.assertEqual(set(serialized_data.keys()), expected_fields)
         self.assertEqual(serialized_data['cart_id'], str(self.cart.cart_id))
         self.assertEqual(float(serialized_data['total_amount']), 46.50)
+
+
+class CartTotalViewTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        """Set up a cart with many lines and an authenticated client"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        for i in range(20):
+            product = Products.objects.create(
+                name=f'Product {i}',
+                price=Decimal('0.99'),
+                quantity=100,
+                created_by=self.user
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+
+    def test_total_within_query_budget(self):
+        """Test that the cart total endpoint stays within its query budget"""
+        response = self.assertWithinQueryBudget('get', '/payments/cart-total/', {'cart_id': str(self.cart.cart_id)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('39.60'))
+
+
+class IdempotentPaymentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        product = Products.objects.create(name='Test Product', price=10, quantity=10, created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+        Order.objects.create(cart=self.cart)
+        self.data = {'cart_id': str(self.cart.cart_id), 'amount': '20.00', 'status': 'paid'}
+
+    def pay(self, key):
+        return self.client.post('/payments/create/', self.data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_does_not_create_a_second_payment(self):
+        first = self.pay('pay-1')
+        retry = self.pay('pay-1')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual((retry.status_code, retry.json()), (202, first.json()))
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.pay('pay-1')
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=other)
+        self.assertFalse(self.pay('pay-1').has_header('Idempotent-Replayed'))
+
+    def test_duplicate_in_flight_gets_conflict(self):
+        IdempotencyRecord.objects.create(
+            user=self.user, view='CreatePaymentView', key=hashlib.sha256(b'pay-1').hexdigest(), fingerprint='running'
+        )
+        with mock.patch.object(CreatePaymentView, 'idempotency_wait_seconds', 0.1):
+            response = self.pay('pay-1')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Payment.objects.count(), 0)
+
+    def test_abandoned_claim_is_taken_over(self):
+        IdempotencyRecord.objects.create(
+            user=self.user, view='CreatePaymentView', key=hashlib.sha256(b'pay-1').hexdigest(), fingerprint='running',
+            created_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT + 1),
+        )
+        self.assertEqual(self.pay('pay-1').status_code, 202)
+        self.assertEqual(self.pay('pay-1')['Idempotent-Replayed'], 'true')
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_failed_request_releases_the_key(self):
+        self.data['amount'] = '-1'
+        self.assertEqual(self.pay('pay-1').status_code, 400)
+        self.data['amount'] = '20.00'
+        response = self.pay('pay-1')
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_rejects_oversized_key(self):
+        self.assertEqual(self.pay('k' * 256).status_code, 400)
+
+
+class FlakyGateway:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.charged = []
+
+    def charge(self, payment, idempotency_key):
+        self.charged.append(idempotency_key)
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+class PaymentPipelineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.product = Products.objects.create(name='Test Product', price=10, quantity=100, created_by=self.user)
+
+    def make_order(self):
+        cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+        return Order.objects.create(cart=cart)
+
+    def pay(self, order):
+        return self.client.post('/payments/create/', {'cart_id': str(order.cart_id), 'amount': '10.00'}, format='json')
+
+    def test_create_queues_and_status_can_be_polled(self):
+        order = self.make_order()
+        response = self.pay(order)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+        status_url = response['Location']
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        self.assertEqual(process_payments(), {'paid': 1})
+        self.assertEqual(self.client.get(status_url).json()['status'], 'paid')
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'paid')
+
+    def test_amount_is_checked_against_the_order_snapshot(self):
+        order = self.make_order()
+        Order.objects.filter(pk=order.pk).update(total_amount=Decimal('10.00'))
+        Products.objects.filter(pk=self.product.pk).update(price=25)
+        self.assertEqual(self.pay(order).status_code, 202)
+        response = self.client.get('/payments/cart-total/', {'cart_id': str(order.cart_id)})
+        self.assertEqual(response.data['total_amount'], Decimal('10.00'))
+
+    def test_status_is_private_to_the_payer(self):
+        payment_id = self.pay(self.make_order()).json()['payment_id']
+        self.client.force_authenticate(user=User.objects.create_user(email='other@example.com', password='x'))
+        self.assertEqual(self.client.get(f'/payments/{payment_id}/').status_code, 404)
+
+    def test_orders_are_updated_in_batches(self):
+        orders = [self.make_order() for _ in range(5)]
+        for order in orders:
+            self.pay(order)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(process_payments(), {'paid': 5})
+        updates = [q['sql'].split()[1] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        # The claim, a renewal before each charge, one settle update, one update for all orders.
+        self.assertEqual(updates, ['"payments"'] * 7 + ['"orders"'])
+        self.assertEqual(set(Order.objects.values_list('payment_status', flat=True)), {'paid'})
+
+    @override_settings(PAYMENT_RETRY_BACKOFF=60, PAYMENT_MAX_ATTEMPTS=2)
+    def test_unavailable_gateway_is_retried_with_backoff(self):
+        order = self.make_order()
+        self.pay(order)
+        gateway = FlakyGateway(GatewayUnavailable('timeout'), GatewayUnavailable('timeout'))
+        started = timezone.now()
+
+        self.assertEqual(process_payments(gateway=gateway), {'pending': 1})
+        payment = Payment.objects.get()
+        self.assertEqual((payment.attempts, payment.last_error), (1, 'timeout'))
+        self.assertGreaterEqual(payment.next_attempt_at, started + timedelta(seconds=60))
+        # Not due yet.
+        self.assertEqual(process_payments(gateway=gateway), {})
+
+        Payment.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_payments(gateway=gateway), {'failed': 1})
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'failed')
+
+    def test_declined_payment_fails_without_retry(self):
+        self.pay(self.make_order())
+        self.assertEqual(process_payments(gateway=FlakyGateway(PaymentDeclined('card declined'))), {'failed': 1})
+        self.assertEqual(Payment.objects.get().last_error, 'card declined')
+
+    def test_cart_with_active_payment_rejects_another(self):
+        order = self.make_order()
+        self.assertEqual(self.pay(order).status_code, 202)
+        self.assertEqual(self.pay(order).status_code, 400)
+        process_payments()
+        self.assertEqual(self.pay(order).status_code, 400)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_failed_payment_can_be_retried_with_a_new_one(self):
+        order = self.make_order()
+        self.pay(order)
+        process_payments(gateway=FlakyGateway(PaymentDeclined('card declined')))
+        self.assertEqual(self.pay(order).status_code, 202)
+        self.assertEqual(process_payments(), {'paid': 1})
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'paid')
+
+    def test_gateway_gets_the_payment_id_as_idempotency_key(self):
+        payment_id = self.pay(self.make_order()).json()['payment_id']
+        gateway = FlakyGateway()
+        process_payments(gateway=gateway)
+        self.assertEqual(gateway.charged, [payment_id])
+
+    def test_payment_reclaimed_by_another_worker_is_not_charged_twice(self):
+        self.pay(self.make_order())
+        claimed = claim_payments(10)
+        # Another worker reclaims it after PAYMENT_PROCESSING_TIMEOUT.
+        Payment.objects.update(updated_at=timezone.now() + timedelta(seconds=1))
+        gateway = FlakyGateway()
+        with mock.patch('payments.services.claim_payments', return_value=claimed):
+            self.assertEqual(process_payments(gateway=gateway), {})
+        self.assertEqual(gateway.charged, [])
+        self.assertEqual(Payment.objects.get().status, 'processing')
+
+    @override_settings(PAYMENT_PROCESSING_TIMEOUT=60)
+    def test_payments_abandoned_by_a_worker_are_reclaimed(self):
+        self.pay(self.make_order())
+        Payment.objects.update(status='processing', updated_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(process_payments(), {'paid': 1})
+
+    def test_state_machine_rejects_invalid_transitions(self):
+        payment = Payment(cart=self.make_order().cart, amount=10)
+        with self.assertRaises(InvalidTransition):
+            payment.transition_to(Payment.Status.PAID)
+        payment.transition_to(Payment.Status.PROCESSING)
+        payment.transition_to(Payment.Status.PAID)
+        with self.assertRaises(InvalidTransition):
+            payment.transition_to(Payment.Status.PENDING)
+
+
+class OneActivePaymentMigrationTest(TransactionTestCase):
+    """0005 adds the one-active-payment constraint on top of existing duplicates."""
+    before = [('payments', '0004_payment_cart_created_index')]
+    after = [('payments', '0005_one_active_payment_per_cart')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_are_failed_keeping_the_earliest(self):
+        self.migrate(self.before)
+        user = User.objects.create_user(email='test@example.com', password='testpass123')
+        cart, other_cart = Cart.objects.create(user=user), Cart.objects.create(user=user)
+        first = Payment.objects.create(cart=cart, amount=10, status='paid')
+        second = Payment.objects.create(cart=cart, amount=10, status='paid')
+        pending = Payment.objects.create(cart=cart, amount=10, status='pending')
+        failed = Payment.objects.create(cart=cart, amount=10, status='failed')
+        Payment.objects.filter(pk=first.pk).update(created_at=timezone.now() - timedelta(days=1))
+        other = Payment.objects.create(cart=other_cart, amount=10, status='paid')
+
+        self.migrate(self.after)
+        statuses = dict(Payment.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {
+            first.pk: 'paid', second.pk: 'failed', pending.pk: 'failed', failed.pk: 'failed', other.pk: 'paid',
+        })
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CreatePaymentView, CartTotalView
+from .views import CreatePaymentView, CartTotalView, PaymentStatusView
 
 urlpatterns = [
     path('create/', CreatePaymentView.as_view(), name='create-payment'),
+    path('<uuid:pk>/', PaymentStatusView.as_view(), name='payment-status'),
     path('cart-total/', CartTotalView.as_view(), name='cart-total'),
 ]
\ No newline at end of file
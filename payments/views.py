@@ -1,22 +1,48 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from carts.models import Cart
+from orders.services import get_payable_total
+from core.idempotency import IdempotentCreateMixin, idempotency_key_parameter
+from .models import Payment
 from .serializers import PaymentSerializer, CartTotalSerializer
 
-class CreatePaymentView(generics.CreateAPIView):
+class CreatePaymentView(IdempotentCreateMixin, generics.CreateAPIView):
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Create a payment for a cart",
+        operation_description="Queue a payment for a cart. It is settled in the background; poll the URL in the Location header for its status.",
         request_body=PaymentSerializer,
-        responses={201: PaymentSerializer}
+        manual_parameters=[idempotency_key_parameter],
+        responses={202: PaymentSerializer}
     )
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        payment = serializer.save()
+        location = reverse('payment-status', kwargs={'pk': payment.pk}, request=request)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+class PaymentStatusView(generics.RetrieveAPIView):
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the current status of one of your payments",
+        responses={200: PaymentSerializer}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Payment.objects.filter(cart__user=self.request.user)
+
 class CartTotalView(generics.GenericAPIView):
     serializer_class = CartTotalSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -32,9 +58,7 @@ class CartTotalView(generics.GenericAPIView):
     )
     def get(self, request, *args, **kwargs):
         cart_id = request.query_params.get('cart_id')
-        try:
-            cart = Cart.objects.get(cart_id=cart_id, user=request.user)
-        except Cart.DoesNotExist:
+        cart = Cart.objects.select_related('order').filter(cart_id=cart_id, user=request.user).first()
+        if cart is None:
             return Response({'detail': 'Cart not found.'}, status=404)
-        total = sum(item.product.price * item.quantity for item in cart.items.all())
-        return Response({'cart_id': cart_id, 'total_amount': total})
+        return Response({'cart_id': cart_id, 'total_amount': get_payable_total(cart)})
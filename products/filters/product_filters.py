@@ -0,0 +1,67 @@
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from drf_yasg import openapi
+
+# Every ordering ends in a unique column so keyset cursors are stable.
+PRODUCT_SORTS = {
+    '-created_at': ('-created_at', '-product_id'),
+    'created_at': ('created_at', 'product_id'),
+    'price': ('price', 'product_id'),
+    '-price': ('-price', '-product_id'),
+    'name': ('name',),
+    '-name': ('-name',),
+}
+
+
+class ProductFilterSerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    in_stock = serializers.BooleanField(required=False, allow_null=True, default=None)
+    created_by = serializers.UUIDField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if 'min_price' in attrs and 'max_price' in attrs and attrs['min_price'] > attrs['max_price']:
+            raise serializers.ValidationError({'max_price': 'Must not be lower than min_price.'})
+        return attrs
+
+
+class ProductFilterBackend(BaseFilterBackend):
+    """
+    Filters products by `?min_price=&max_price=&in_stock=&created_by=&created_after=&created_before=`.
+    The lookups line up with the indexes on Products.
+    """
+    lookups = {
+        'min_price': 'price__gte',
+        'max_price': 'price__lte',
+        'created_by': 'created_by_id',
+        'created_after': 'created_at__gte',
+        'created_before': 'created_at__lt',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = ProductFilterSerializer(data=request.query_params.dict())
+        serializer.is_valid(raise_exception=True)
+        filters = {
+            self.lookups[name]: value
+            for name, value in serializer.validated_data.items()
+            if name in self.lookups
+        }
+        in_stock = serializer.validated_data.get('in_stock')
+        if in_stock is True:
+            filters['quantity__gt'] = 0
+        elif in_stock is False:
+            filters['quantity'] = 0
+        return queryset.filter(**filters)
+
+
+swagger_filter_parameters = [
+    openapi.Parameter('min_price', openapi.IN_QUERY, description="Lowest price, inclusive", type=openapi.TYPE_NUMBER),
+    openapi.Parameter('max_price', openapi.IN_QUERY, description="Highest price, inclusive", type=openapi.TYPE_NUMBER),
+    openapi.Parameter('in_stock', openapi.IN_QUERY, description="Only products with (true) or without (false) stock", type=openapi.TYPE_BOOLEAN),
+    openapi.Parameter('created_by', openapi.IN_QUERY, description="Id of the user who listed the product", type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
+    openapi.Parameter('created_after', openapi.IN_QUERY, description="Listed at or after this time (ISO 8601)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    openapi.Parameter('created_before', openapi.IN_QUERY, description="Listed before this time (ISO 8601)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+]
@@ -0,0 +1,23 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from products.services import bulk_services
+
+
+class Command(BaseCommand):
+    help = "Write every product as CSV or NDJSON, streamed row by row, to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=bulk_services.FORMATS, default='csv')
+        parser.add_argument('--output', help="File to write; defaults to stdout")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in bulk_services.export_products(options['format'], chunk_size=options['chunk_size']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from products.services import bulk_services
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update products from a CSV (header row) or NDJSON file, matched by name. "
+        "The file is read line by line and written in batches; pass - to read stdin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True, help="Email of the user who owns new products")
+        parser.add_argument('--format', choices=bulk_services.FORMATS, help="Defaults to the file extension, else csv")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            owner = get_user_model().objects.get(email=options['owner'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['owner']}")
+        path = options['path']
+        file_format = options['format'] or bulk_services.format_from_name(path)
+
+        started = time.perf_counter()
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        try:
+            report = bulk_services.import_products(
+                bulk_services.PARSERS[file_format](stream), owner, batch_size=options['batch_size']
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.perf_counter() - started
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        rows = report.created + report.updated
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {rows} products ({report.created} created, {report.updated} updated, "
+            f"{report.failed} failed) in {elapsed:.1f}s, {rows / elapsed if elapsed else 0:.0f} rows/s"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from products.services.search_services import install_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the product search index and its sync triggers. Run after restoring a "
+        "dump or a VACUUM on SQLite, which may renumber the rowids the FTS table points at."
+    )
+
+    def handle(self, *args, **options):
+        with connection.schema_editor() as schema_editor:
+            install_search_index(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the product search index ({connection.vendor})"))
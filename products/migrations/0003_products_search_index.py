@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from products.services.search_services import install_search_index, remove_search_index
+
+
+def forwards(apps, schema_editor):
+    install_search_index(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    remove_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_products_price'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_products_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['created_at', 'product_id'], name='products_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['price', 'product_id'], name='products_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['price', 'product_id'], name='products_instock_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['created_by', 'created_at', 'product_id'], name='products_owner_created_idx'),
+        ),
+    ]
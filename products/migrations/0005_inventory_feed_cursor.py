@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_products_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryFeedCursor',
+            fields=[
+                ('feed', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('last_sequence', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Inventory Feed Cursor',
+                'verbose_name_plural': 'Inventory Feed Cursors',
+                'db_table': 'inventory_feed_cursors',
+            },
+        ),
+    ]
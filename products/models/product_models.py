@@ -29,4 +29,25 @@ class Products(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['created_at', 'product_id'], name='products_created_id_idx'),
+            models.Index(fields=['price', 'product_id'], name='products_price_id_idx'),
+            models.Index(
+                fields=['price', 'product_id'], condition=models.Q(quantity__gt=0), name='products_instock_price_idx'
+            ),
+            models.Index(fields=['created_by', 'created_at', 'product_id'], name='products_owner_created_idx'),
         ]
+
+
+class InventoryFeedCursor(models.Model):
+    """Last batch sequence number applied from each warehouse stock feed."""
+    feed = models.CharField(max_length=100, primary_key=True)
+    last_sequence = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.feed} @ {self.last_sequence}"
+
+    class Meta:
+        db_table = 'inventory_feed_cursors'
+        verbose_name = "Inventory Feed Cursor"
+        verbose_name_plural = "Inventory Feed Cursors"
@@ -1,10 +1,95 @@
+from django.utils import timezone
 from rest_framework import serializers
 
+from core.conditional import PreconditionFailed
+from core.serializers import DynamicFieldsModelSerializer
 from products.models.product_models import Products
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Products
         fields = '__all__'
         read_only_fields = ('product_id', 'created_by', 'created_at', 'updated_at')
+
+    def update(self, instance, validated_data):
+        # Write only the columns that change; an update changing nothing
+        # leaves the row (and its ETag) alone.
+        changed = [name for name, value in validated_data.items() if getattr(instance, name) != value]
+        for name in changed:
+            setattr(instance, name, validated_data[name])
+        if not changed:
+            return instance
+        expected = self.context.get('expected_updated_at')
+        if expected is None:
+            instance.save(update_fields=[*changed, 'updated_at'])
+            return instance
+        # Conditional request: compare and write in one statement, so a change
+        # committed after the If-Match check is not overwritten.
+        instance.updated_at = timezone.now()
+        written = Products.objects.filter(pk=instance.pk, updated_at=expected).update(
+            **{name: getattr(instance, name) for name in changed}, updated_at=instance.updated_at
+        )
+        if not written:
+            raise PreconditionFailed()
+        return instance
+
+
+class ProductSuggestionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Products
+        fields = ('product_id', 'name')
+
+
+class ProductRowSerializer(serializers.ModelSerializer):
+    """
+    One row of a bulk import. The name's unique validator is dropped because
+    an existing name is an update, not an error.
+    """
+
+    class Meta:
+        model = Products
+        fields = ('name', 'description', 'quantity', 'price')
+        extra_kwargs = {'name': {'validators': []}}
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    delta = serializers.IntegerField(required=False)
+    absolute = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        if ('delta' in attrs) == ('absolute' in attrs):
+            raise serializers.ValidationError("Give exactly one of delta or absolute.")
+        return attrs
+
+
+class StockAdjustmentBatchSerializer(serializers.Serializer):
+    feed = serializers.CharField(max_length=100)
+    sequence = serializers.IntegerField(min_value=0)
+    adjustments = StockAdjustmentSerializer(many=True, allow_empty=False, max_length=1000)
+
+
+class StockAdjustmentResultSerializer(serializers.Serializer):
+    applied = serializers.IntegerField()
+    unknown = serializers.ListField(child=serializers.UUIDField())
+    duplicate = serializers.BooleanField()
+
+
+class ProductIdListSerializer(serializers.Serializer):
+    product_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=5000)
+
+
+class ProductBulkUpdateSerializer(ProductIdListSerializer):
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    quantity = serializers.IntegerField(required=False, min_value=0)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError("Give at least one of description, quantity or price.")
+        return attrs
+
+
+class ProductBulkResultSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
@@ -0,0 +1,149 @@
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from products.models.product_models import Products
+from products.serializers.product_serializers import ProductRowSerializer
+from products.services.cache_services import invalidate_products
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_FIELDS = ('product_id', 'name', 'description', 'quantity', 'price', 'created_by', 'created_at', 'updated_at')
+UPDATE_FIELDS = ['description', 'quantity', 'price', 'updated_at']
+
+
+class RowError(Exception):
+    pass
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, errors, max_errors):
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'updated': self.updated, 'failed': self.failed, 'errors': self.errors}
+
+
+def format_from_name(filename, default='csv'):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return {'jsonl': 'ndjson', 'ndjson': 'ndjson', 'csv': 'csv'}.get(extension, default)
+
+
+def parse_csv(lines):
+    """Yield `(line_number, row)` from CSV text lines with a header row."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        row.pop(None, None)  # values beyond the header
+        yield reader.line_num, row
+
+
+def parse_ndjson(lines):
+    """Yield `(line_number, row)` from newline-delimited JSON objects."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, RowError(f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("Expected a JSON object.")
+            continue
+        yield line_number, row
+
+
+PARSERS = {'csv': parse_csv, 'ndjson': parse_ndjson}
+
+
+def _upsert_batch(batch, owner, report):
+    # A name repeated within one batch keeps its last row; ON CONFLICT cannot
+    # touch the same row twice in one statement.
+    rows = {}
+    for data in batch:
+        rows[data['name']] = data
+    with transaction.atomic():
+        existing = dict(Products.objects.filter(name__in=rows).values_list('name', 'pk'))
+        Products.objects.bulk_create(
+            [Products(created_by=owner, **data) for data in rows.values()],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=UPDATE_FIELDS,
+        )
+        invalidate_products(existing.values())
+    report.updated += len(existing)
+    report.created += len(rows) - len(existing)
+
+
+def import_products(rows, owner, batch_size=1000, max_errors=1000):
+    """
+    Validate and upsert `(line_number, row)` pairs from `parse_csv` or
+    `parse_ndjson`, matching existing products by name.
+
+    Rows are read lazily and written `batch_size` at a time, each batch in
+    its own transaction with one INSERT ... ON CONFLICT DO UPDATE, so memory
+    stays flat however large the input is. Invalid rows are skipped and
+    reported by line number; new products are owned by `owner`.
+    """
+    report = ImportReport()
+    # One serializer validates every row; building its fields per row would
+    # cost more than the inserts.
+    validator = ProductRowSerializer()
+    batch = []
+    for line_number, row in rows:
+        if isinstance(row, RowError):
+            report.add_error(line_number, [str(row)], max_errors)
+            continue
+        try:
+            batch.append(validator.run_validation(row))
+        except ValidationError as exc:
+            report.add_error(line_number, exc.detail, max_errors)
+            continue
+        if len(batch) >= batch_size:
+            _upsert_batch(batch, owner, report)
+            batch = []
+    if batch:
+        _upsert_batch(batch, owner, report)
+    return report
+
+
+class _Echo:
+    """File-like object whose `write` returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(queryset, chunk_size):
+    columns = ['created_by_id' if name == 'created_by' else name for name in EXPORT_FIELDS]
+    return queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def export_products(file_format='csv', queryset=None, chunk_size=2000):
+    """
+    Yield the catalog as CSV or NDJSON text, one row at a time. Rows are
+    fetched `chunk_size` at a time (a server-side cursor on PostgreSQL), so
+    the table is never held in memory.
+    """
+    queryset = Products.objects.all() if queryset is None else queryset
+    rows = _export_rows(queryset, chunk_size)
+    if file_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n'
+        return
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core.metrics import registry
+
+LIST_VERSION_KEY = 'products:list:version'
+
+
+class CacheStats:
+    """Per-process hit/miss counters for the product cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, kind, hit):
+        with self._lock:
+            self._counts[(kind, 'hit' if hit else 'miss')] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+def collect_metrics():
+    return {
+        ('ministore_product_cache_requests_total', (('kind', kind), ('result', result))): count
+        for (kind, result), count in stats.snapshot().items()
+    }
+
+
+registry.describe('ministore_product_cache_requests_total', 'Product cache lookups by kind and result.')
+registry.register_collector(collect_metrics)
+
+
+def get_cache():
+    return caches[settings.PRODUCT_CACHE_ALIAS]
+
+
+def is_enabled():
+    return settings.PRODUCT_CACHE_ENABLED
+
+
+def detail_key(product_id):
+    return f'products:detail:{product_id}'
+
+
+def _new_list_version():
+    # Seeded from the clock so an evicted version key never comes back at a
+    # value that older, still-cached pages were stored under.
+    return time.time_ns() // 1000
+
+
+def get_list_version():
+    cache = get_cache()
+    version = cache.get(LIST_VERSION_KEY)
+    if version is None:
+        cache.add(LIST_VERSION_KEY, _new_list_version(), timeout=None)
+        version = cache.get(LIST_VERSION_KEY)
+    return version
+
+
+def list_key(version, url):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return f'products:list:{version}:{digest}'
+
+
+def _get_or_set(kind, key, loader):
+    cache = get_cache()
+    payload = cache.get(key)
+    stats.record(kind, payload is not None)
+    if payload is None:
+        payload = loader()
+        cache.set(key, payload, timeout=settings.PRODUCT_CACHE_TIMEOUT)
+    return payload
+
+
+def get_product_payload(product_id, loader):
+    """Return the serialized product, calling `loader()` on a miss."""
+    if not is_enabled():
+        return loader()
+    return _get_or_set('detail', detail_key(product_id), loader)
+
+
+def get_list_payload(url, loader):
+    """
+    Return a serialized product list page keyed by its full URL (cursor,
+    page size and projected fields). Pages are grouped under a version that
+    every product write bumps, so one write invalidates all cached pages.
+    """
+    if not is_enabled():
+        return loader()
+    return _get_or_set('list', list_key(get_list_version(), url), loader)
+
+
+async def aget_list_version():
+    cache = get_cache()
+    version = await cache.aget(LIST_VERSION_KEY)
+    if version is None:
+        await cache.aadd(LIST_VERSION_KEY, _new_list_version(), timeout=None)
+        version = await cache.aget(LIST_VERSION_KEY)
+    return version
+
+
+async def _aget_or_set(kind, key, loader):
+    cache = get_cache()
+    payload = await cache.aget(key)
+    stats.record(kind, payload is not None)
+    if payload is None:
+        payload = await loader()
+        await cache.aset(key, payload, timeout=settings.PRODUCT_CACHE_TIMEOUT)
+    return payload
+
+
+async def aget_product_payload(product_id, loader):
+    """Async `get_product_payload`; `loader` is a coroutine function."""
+    if not is_enabled():
+        return await loader()
+    return await _aget_or_set('detail', detail_key(product_id), loader)
+
+
+async def aget_list_payload(url, loader):
+    """Async `get_list_payload`; `loader` is a coroutine function."""
+    if not is_enabled():
+        return await loader()
+    return await _aget_or_set('list', list_key(await aget_list_version(), url), loader)
+
+
+def _invalidate(product_ids):
+    cache = get_cache()
+    if product_ids:
+        cache.delete_many([detail_key(product_id) for product_id in product_ids])
+    try:
+        cache.incr(LIST_VERSION_KEY)
+    except ValueError:
+        cache.set(LIST_VERSION_KEY, _new_list_version(), timeout=None)
+
+
+def invalidate_products(product_ids=()):
+    """
+    Drop cached payloads for `product_ids` and every cached list page once
+    the current transaction commits, so a concurrent reader cannot re-cache
+    the pre-commit rows.
+    """
+    transaction.on_commit(partial(_invalidate, list(product_ids)))
@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+from django.db.models import Count, Q
+
+# (lower, upper) bounds, lower inclusive and upper exclusive; None is open.
+PRICE_BUCKETS = [
+    (None, Decimal('10')),
+    (Decimal('10'), Decimal('25')),
+    (Decimal('25'), Decimal('50')),
+    (Decimal('50'), Decimal('100')),
+    (Decimal('100'), None),
+]
+
+
+def _bucket_filter(lower, upper):
+    condition = Q()
+    if lower is not None:
+        condition &= Q(price__gte=lower)
+    if upper is not None:
+        condition &= Q(price__lt=upper)
+    return condition
+
+
+def product_facets(queryset):
+    """
+    Count `queryset` by price bucket and stock state with a single aggregate
+    query, so facets cost one pass over the (filtered, indexed) rows.
+    """
+    aggregates = {
+        'count': Count('pk'),
+        'in_stock': Count('pk', filter=Q(quantity__gt=0)),
+    }
+    for index, (lower, upper) in enumerate(PRICE_BUCKETS):
+        aggregates[f'price_{index}'] = Count('pk', filter=_bucket_filter(lower, upper))
+    row = queryset.order_by().aggregate(**aggregates)
+    return {
+        'count': row['count'],
+        'in_stock': row['in_stock'],
+        'out_of_stock': row['count'] - row['in_stock'],
+        'price': [
+            {'min': lower, 'max': upper, 'count': row[f'price_{index}']}
+            for index, (lower, upper) in enumerate(PRICE_BUCKETS)
+        ],
+    }
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from products.models.product_models import InventoryFeedCursor, Products
+from products.services.cache_services import invalidate_products
+
+
+class InsufficientStock(Exception):
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(shortages)
+
+    def messages(self):
+        return [
+            f"Not enough stock for {name} (requested: {requested}, available: {available})"
+            for name, requested, available in self.shortages
+        ]
+
+
+def _shortages(quantities, rows):
+    return [
+        (name, quantities[pk], available)
+        for pk, name, available in rows
+        if quantities[pk] > available
+    ]
+
+
+def reserve_stock(quantities):
+    """
+    Atomically take `quantities` ({product_id: quantity}) out of stock.
+
+    Rows are locked in primary-key order so concurrent checkouts over the same
+    products cannot deadlock, and every line is decremented by one
+    conditional UPDATE, so no product ever goes negative. Either every line is
+    reserved or InsufficientStock is raised and nothing changes.
+    """
+    quantities = {pk: quantity for pk, quantity in quantities.items() if quantity}
+    if not quantities:
+        return
+
+    with transaction.atomic():
+        rows = list(
+            Products.objects.select_for_update()
+            .filter(pk__in=quantities)
+            .order_by('pk')
+            .values_list('pk', 'name', 'quantity')
+        )
+        shortages = _shortages(quantities, rows)
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        updated = Products.objects.filter(
+            reduce(or_, (Q(pk=pk, quantity__gte=quantity) for pk, quantity in quantities.items()))
+        ).update(
+            quantity=Case(
+                *(When(pk=pk, then=F('quantity') - quantity) for pk, quantity in quantities.items()),
+                default=F('quantity'),
+                output_field=Products._meta.get_field('quantity'),
+            ),
+            updated_at=timezone.now(),
+        )
+        if updated != len(quantities):
+            # Only reachable on backends without row locks: another
+            # transaction took the stock between the read and the UPDATE.
+            rows = Products.objects.filter(pk__in=quantities).values_list('pk', 'name', 'quantity')
+            raise InsufficientStock(_shortages(quantities, rows))
+        invalidate_products(quantities)
+
+
+class SequenceGap(Exception):
+    """A feed batch arrived before the one preceding it was applied."""
+
+    def __init__(self, feed, expected):
+        self.feed = feed
+        self.expected = expected
+        super().__init__(f"Feed {feed} expects batch {expected} next.")
+
+
+@dataclass(frozen=True)
+class AdjustmentResult:
+    applied: int
+    unknown: list
+    duplicate: bool = False
+
+
+def _claim_sequence(feed, sequence):
+    """
+    Move `feed`'s cursor to `sequence`, or return False if this batch was
+    already applied. Batches must arrive in order: a later one cannot be
+    applied before the one before it (an absolute quantity from an older
+    batch would overwrite a newer one), so a gap raises SequenceGap and
+    nothing is applied. The first batch of a feed may start at any number.
+    The conditional UPDATE locks the cursor row, so concurrent batches of
+    one feed apply one at a time.
+    """
+    if InventoryFeedCursor.objects.filter(feed=feed, last_sequence=sequence - 1).update(last_sequence=sequence):
+        return True
+    last_sequence = InventoryFeedCursor.objects.filter(feed=feed).values_list('last_sequence', flat=True).first()
+    if last_sequence is None:
+        try:
+            with transaction.atomic():
+                InventoryFeedCursor.objects.create(feed=feed, last_sequence=sequence)
+            return True
+        except IntegrityError:
+            # Another batch created the cursor first; judge against it.
+            last_sequence = InventoryFeedCursor.objects.values_list('last_sequence', flat=True).get(feed=feed)
+    if sequence <= last_sequence:
+        return False
+    if sequence == last_sequence + 1:
+        # The cursor moved between the UPDATE and the read; try again.
+        return _claim_sequence(feed, sequence)
+    raise SequenceGap(feed, last_sequence + 1)
+
+
+def _target_quantities(adjustments):
+    # Fold each product's lines, in order, into an absolute value or a delta.
+    # A delta is clamped once, on the final value; after an absolute the
+    # running value is known, so each following delta is clamped as it goes.
+    targets = {}
+    for adjustment in adjustments:
+        kind, value = targets.get(adjustment['product_id'], ('delta', 0))
+        if adjustment.get('absolute') is not None:
+            kind, value = 'absolute', adjustment['absolute']
+        elif kind == 'absolute':
+            value = max(value + adjustment['delta'], 0)
+        else:
+            value += adjustment['delta']
+        targets[adjustment['product_id']] = (kind, value)
+    return targets
+
+
+def apply_stock_adjustments(adjustments, feed, sequence):
+    """
+    Apply `{product_id, delta}` / `{product_id, absolute}` lines from batch
+    `sequence` of warehouse `feed` with one CASE UPDATE in one transaction.
+    Quantities never go below zero, a batch whose sequence was already
+    applied is skipped as a duplicate, one that skips ahead of the feed's
+    next sequence raises SequenceGap, and unknown products are reported
+    rather than failing the batch.
+    """
+    targets = _target_quantities(adjustments)
+    with transaction.atomic():
+        if not _claim_sequence(feed, sequence):
+            return AdjustmentResult(applied=0, unknown=[], duplicate=True)
+        known = set(Products.objects.filter(pk__in=targets).order_by().values_list('pk', flat=True))
+        if known:
+            # One WHEN per distinct change rather than per product: feeds
+            # repeat the same deltas, and each WHEN costs ORM compile time.
+            groups = defaultdict(list)
+            for pk, target in targets.items():
+                if pk in known:
+                    groups[target].append(pk)
+            Products.objects.filter(pk__in=known).update(
+                quantity=Case(
+                    *(
+                        When(pk__in=pks, then=Value(value) if kind == 'absolute' else Greatest(F('quantity') + value, 0))
+                        for (kind, value), pks in groups.items()
+                    ),
+                    default=F('quantity'),
+                    output_field=Products._meta.get_field('quantity'),
+                ),
+                updated_at=timezone.now(),
+            )
+            invalidate_products(known)
+    return AdjustmentResult(applied=len(known), unknown=[pk for pk in targets if pk not in known])
@@ -0,0 +1,168 @@
+import re
+
+from django.db import connection, transaction
+
+from products.models.product_models import Products
+
+SEARCH_CONFIG = 'english'
+# Must match the expression of the GIN index created in migration 0003.
+PG_DOCUMENT = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))"
+PG_TRIGRAM_THRESHOLD = 0.3
+
+SQLITE_FTS_TABLE = 'products_fts'
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name, description,
+        content='products', content_rowid='rowid',
+        prefix='2 3 4', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.rowid, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.rowid, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.rowid, old.name, old.description);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.rowid, new.name, new.description);
+    END
+    """,
+]
+SQLITE_FTS_DROP = [
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+]
+
+PG_INDEX_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX IF NOT EXISTS products_search_document_idx ON products USING GIN ({PG_DOCUMENT})',
+    'CREATE INDEX IF NOT EXISTS products_name_trgm_idx ON products USING GIN (name gin_trgm_ops)',
+]
+PG_INDEX_DROP = [
+    'DROP INDEX IF EXISTS products_name_trgm_idx',
+    'DROP INDEX IF EXISTS products_search_document_idx',
+]
+
+
+def install_search_index(schema_editor):
+    """Create the full-text index for the current backend and fill it."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = PG_INDEX_DDL
+    elif vendor == 'sqlite':
+        statements = SQLITE_FTS_DDL + [f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"]
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def remove_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': PG_INDEX_DROP, 'sqlite': SQLITE_FTS_DROP}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def tokenize(query):
+    return re.findall(r'\w+', query.lower())[:10]
+
+
+def _sqlite_match(terms, column=None):
+    # Every term must match; the last one is a prefix so results appear
+    # while the user is still typing it.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    expression = ' AND '.join(quoted)
+    return f'{column} : ({expression})' if column else expression
+
+
+def search_products(query, limit, offset=0):
+    """
+    Rank products whose name or description match every word of `query`
+    (the last word as a prefix). Returns up to `limit` Products, best first.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(terms) + ':*'
+        return list(Products.objects.raw(
+            f"""
+            SELECT *, ts_rank({PG_DOCUMENT}, to_tsquery('english', %s)) AS rank
+            FROM products
+            WHERE {PG_DOCUMENT} @@ to_tsquery('english', %s)
+            ORDER BY rank DESC, product_id
+            LIMIT %s OFFSET %s
+            """,
+            [tsquery, tsquery, limit, offset],
+        ))
+    if connection.vendor == 'sqlite':
+        return list(Products.objects.raw(
+            f"""
+            SELECT products.*, bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) AS rank
+            FROM {SQLITE_FTS_TABLE}
+            JOIN products ON products.rowid = {SQLITE_FTS_TABLE}.rowid
+            WHERE {SQLITE_FTS_TABLE} MATCH %s
+            ORDER BY rank, products.product_id
+            LIMIT %s OFFSET %s
+            """,
+            [_sqlite_match(terms), limit, offset],
+        ))
+    queryset = Products.objects.all()
+    for term in terms:
+        queryset = queryset.filter(name__icontains=term)
+    return list(queryset.order_by('name')[offset:offset + limit])
+
+
+def autocomplete(prefix, limit):
+    """
+    Suggest product names for a partially typed `prefix`. On PostgreSQL,
+    trigram similarity also matches names with typos.
+    """
+    terms = tokenize(prefix)
+    if not terms:
+        return []
+    if connection.vendor == 'postgresql':
+        text = ' '.join(terms)
+        # Both ILIKE and the % operator are answered from the gin_trgm_ops
+        # index; similarity() itself is only used to order the matches. The
+        # operator's threshold is set for this transaction only.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", [str(PG_TRIGRAM_THRESHOLD)])
+            return list(Products.objects.raw(
+                """
+                SELECT product_id, name, similarity(name, %s) AS score
+                FROM products
+                WHERE name ILIKE %s OR name %% %s
+                ORDER BY (name ILIKE %s) DESC, score DESC, name
+                LIMIT %s
+                """,
+                [text, f'{text}%', text, f'{text}%', limit],
+            ))
+    if connection.vendor == 'sqlite':
+        return list(Products.objects.raw(
+            f"""
+            SELECT products.product_id, products.name
+            FROM {SQLITE_FTS_TABLE}
+            JOIN products ON products.rowid = {SQLITE_FTS_TABLE}.rowid
+            WHERE {SQLITE_FTS_TABLE} MATCH %s
+            ORDER BY bm25({SQLITE_FTS_TABLE}), products.name
+            LIMIT %s
+            """,
+            [_sqlite_match(terms, column='name'), limit],
+        ))
+    return list(Products.objects.filter(name__istartswith=' '.join(terms)).order_by('name')[:limit])
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, pre_delete
+
+from carts.models import CartItem
+from orders.models import OrderItem
+from products.models.product_models import Products
+
+# Every foreign key to Products, as (model, field name). delete_products
+# clears these itself before deleting the product rows.
+HANDLED_RELATIONS = {(CartItem, 'product'), (OrderItem, 'product')}
+
+
+def product_relations():
+    # include_hidden: OrderItem.product has related_name='+'.
+    return {
+        (field.related_model, field.field.name)
+        for field in Products._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_many or field.one_to_one)
+    }
+
+
+def _raw_delete(queryset):
+    """
+    Delete the product rows in one statement, bypassing the ORM collector,
+    which would select the ids and then cascade in batches of the backend's
+    parameter limit. Only safe while every foreign key to Products is in
+    HANDLED_RELATIONS and nothing listens for product deletes; otherwise
+    this falls back to the collector so on_delete and signals still run.
+    """
+    if product_relations() != HANDLED_RELATIONS or pre_delete.has_listeners(Products) or post_delete.has_listeners(Products):
+        _, deleted = queryset.delete()
+        return deleted.get(Products._meta.label, 0)
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_products(queryset):
+    """
+    Delete the products in `queryset` with one statement per table, each
+    scoped by a subquery on `queryset`, however many products match. Order
+    lines keep their snapshot and lose the product link, as SET_NULL would;
+    cart lines are deleted. Returns the number of products deleted; call
+    inside a transaction.
+    """
+    product_ids = queryset.values('pk')
+    OrderItem.objects.filter(product__in=product_ids).update(product=None)
+    CartItem.objects.filter(product__in=product_ids).delete()
+    return _raw_delete(queryset)
@@ -1,12 +1,37 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from unittest import mock, skipUnless
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 from rest_framework.request import Request
 from rest_framework.exceptions import PermissionDenied
 import uuid
+from datetime import timedelta
+from django.utils import timezone
 from .serializers.product_serializers import ProductSerializer
-from .models.product_models import Products
+from .models.product_models import InventoryFeedCursor, Products
 from .views.product_views import ProductUpdateView, ProductDeleteView
+from .services import bulk_services, cache_services, search_services, seller_services
+from core.conditional import conditional_response
+from core.testing import QueryBudgetMixin
+from carts.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from .services.inventory_services import reserve_stock
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
 
 User = get_user_model()
 
@@ -196,3 +221,710 @@ class ProductViewTest(TestCase):
         self.assertEqual(float(created_product.price), 25.99)
         self.assertEqual(created_product.quantity, 30)
         
+
+
+class ProductListPaginationTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.products = [
+            Products.objects.create(
+                name=f'Product {i}',
+                description=f'Description {i}',
+                price=i,
+                quantity=i,
+                created_by=self.user
+            )
+            for i in range(7)
+        ]
+        # Give a few rows the same timestamp so the product_id tie-breaker matters.
+        tied = [product.product_id for product in self.products[2:5]]
+        Products.objects.filter(product_id__in=tied).update(created_at=self.products[2].created_at)
+
+    def fetch_all(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['product_id'] for item in response.data['results'])
+            url = response.data['next']
+        return seen
+
+    def test_pages_follow_created_at_then_product_id(self):
+        expected = [
+            str(pk) for pk in Products.objects.order_by('-created_at', '-product_id')
+            .values_list('product_id', flat=True)
+        ]
+        self.assertEqual(self.fetch_all('/products/products/?page_size=2'), expected)
+
+    def test_page_size_and_next_link(self):
+        response = self.client.get('/products/products/', {'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIn('cursor=', response.data['next'])
+
+        response = self.client.get('/products/products/', {'page_size': 10})
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertIsNone(response.data['next'])
+
+    def test_page_query_count_is_constant(self):
+        first = self.assertWithinQueryBudget('get', '/products/products/', {'page_size': 2})
+        self.assertWithinQueryBudget('get', first.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/products/products/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_fields_projection(self):
+        response = self.client.get('/products/products/', {'fields': 'name,price', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        for item in response.data['results']:
+            self.assertEqual(set(item.keys()), {'name', 'price'})
+        self.assertIn('fields=name%2Cprice', response.data['next'])
+
+    def test_fields_projection_limits_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/products/products/', {'fields': 'name'})
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_field_rejected(self):
+        response = self.client.get('/products/products/', {'fields': 'name,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
+
+
+class ProductCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache_services.stats.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.product = Products.objects.create(
+            name='Cached Product',
+            price=10,
+            quantity=5,
+            created_by=self.user
+        )
+        self.detail_url = f'/products/products/{self.product.product_id}/'
+
+    def test_detail_served_from_cache(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.data['name'], 'Cached Product')
+        self.assertEqual(cache_services.stats.snapshot(), {('detail', 'miss'): 1, ('detail', 'hit'): 1})
+
+    def test_list_served_from_cache(self):
+        self.client.get('/products/products/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/products/products/')
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_missing_product_not_cached(self):
+        url = f'/products/products/{uuid.uuid4()}/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(cache_services.stats.snapshot(), {('detail', 'miss'): 2})
+
+    def test_update_invalidates_detail_and_list(self):
+        self.client.get(self.detail_url)
+        self.client.get('/products/products/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                f'/products/products/{self.product.product_id}/update/',
+                {'name': 'Renamed', 'price': '10.00', 'quantity': 5},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.detail_url).data['name'], 'Renamed')
+        self.assertEqual(self.client.get('/products/products/').data['results'][0]['name'], 'Renamed')
+
+    def test_create_and_delete_invalidate_list(self):
+        self.client.get('/products/products/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/products/products/', {'name': 'Second', 'price': '1.00'}, format='json')
+        self.assertEqual(len(self.client.get('/products/products/').data['results']), 2)
+
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/products/products/{self.product.product_id}/delete/')
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+        self.assertEqual(len(self.client.get('/products/products/').data['results']), 1)
+
+    def test_stock_reservation_invalidates_detail(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_stock({self.product.product_id: 2})
+        self.assertEqual(self.client.get(self.detail_url).data['quantity'], 3)
+
+    @override_settings(PRODUCT_CACHE_ENABLED=False)
+    def test_disabled_cache_reads_database(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(1):
+            self.client.get(self.detail_url)
+
+
+@skipUnless(fakeredis, 'fakeredis is not installed')
+class ProductRedisCacheTest(ProductCacheTest):
+    def setUp(self):
+        redis_settings = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': 'redis://fake-redis:6379/0',
+                'OPTIONS': {'connection_class': fakeredis.FakeConnection},
+            }
+        })
+        redis_settings.enable()
+        self.addCleanup(redis_settings.disable)
+        super().setUp()
+
+
+class AsyncProductViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            Products.objects.create(name=f'Product {i}', price=i, quantity=i, created_by=self.user)
+
+    def test_list_matches_sync_view(self):
+        sync = self.client.get('/products/products/', {'page_size': 2, 'fields': 'product_id,name'}).json()
+        cache.clear()
+        response = self.client.get('/products/async/products/', {'page_size': 2, 'fields': 'product_id,name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], sync['results'])
+        self.assertEqual(len(self.client.get(response.json()['next']).json()['results']), 1)
+
+    def test_detail(self):
+        product = Products.objects.first()
+        response = self.client.get(f'/products/async/products/{product.product_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], product.name)
+        self.assertEqual(self.client.get(f'/products/async/products/{uuid.uuid4()}/').status_code, 404)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get('/products/async/products/').status_code, 401)
+
+
+class ProductSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.keyboard = Products.objects.create(
+            name='Mechanical Keyboard', description='Hot-swappable switches', price=80, quantity=5, created_by=self.user
+        )
+        self.mouse = Products.objects.create(
+            name='Wireless Mouse', description='Pairs with any keyboard', price=25, quantity=5, created_by=self.user
+        )
+        Products.objects.create(name='Desk Lamp', description='Warm light', price=30, quantity=5, created_by=self.user)
+
+    def search(self, q, **params):
+        response = self.client.get('/products/products/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_name_matches_rank_above_description_matches(self):
+        names = [row['name'] for row in self.search('keyboard')['results']]
+        self.assertEqual(names, ['Mechanical Keyboard', 'Wireless Mouse'])
+
+    def test_last_word_matches_as_prefix(self):
+        names = [row['name'] for row in self.search('wireless mou')['results']]
+        self.assertEqual(names, ['Wireless Mouse'])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.mouse.name = 'Trackball'
+        self.mouse.save()
+        self.keyboard.delete()
+        self.assertEqual(self.search('mouse')['results'], [])
+        self.assertEqual([row['name'] for row in self.search('trackb')['results']], ['Trackball'])
+        self.assertEqual([row['name'] for row in self.search('keyboard')['results']], ['Trackball'])
+
+    def test_paginates_and_projects(self):
+        page = self.search('keyboard', page_size=1, fields='product_id,name')
+        self.assertEqual(page['results'], [{'product_id': str(self.keyboard.product_id), 'name': 'Mechanical Keyboard'}])
+        second = self.client.get(page['next']).json()
+        self.assertEqual([row['name'] for row in second['results']], ['Wireless Mouse'])
+        self.assertIsNone(second['next'])
+
+    def test_punctuation_only_query_returns_nothing(self):
+        self.assertEqual(self.search('"*:(')['results'], [])
+
+    def test_autocomplete(self):
+        response = self.client.get('/products/products/autocomplete/', {'q': 'mec'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'product_id': str(self.keyboard.product_id), 'name': 'Mechanical Keyboard'}])
+
+    def test_search_uses_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search('keyboard')
+        # Session/auth lookups aside, the search itself is a single statement.
+        self.assertEqual(sum('MATCH' in q['sql'] or '@@' in q['sql'] for q in queries.captured_queries), 1)
+
+
+class ProductFilterSortFacetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        prices = [5, 12, 30, 30, 45, 70, 150]
+        self.products = [
+            Products.objects.create(
+                name=f'Product {i}',
+                price=price,
+                quantity=0 if i % 3 == 0 else 4,
+                created_by=self.user if i % 2 else self.other,
+            )
+            for i, price in enumerate(prices)
+        ]
+
+    def list_names(self, **params):
+        names, url = [], None
+        while True:
+            response = self.client.get(url) if url else self.client.get('/products/products/', {'page_size': 2, **params})
+            self.assertEqual(response.status_code, 200, response.content)
+            names += [row['name'] for row in response.json()['results']]
+            url = response.json()['next']
+            if not url:
+                return names
+
+    def test_in_stock_under_price_sorted_by_price(self):
+        names = self.list_names(in_stock='true', max_price='50', sort='price')
+        self.assertEqual(names, ['Product 1', 'Product 2', 'Product 4'])
+
+    def test_price_sort_pages_through_ties(self):
+        expected = [p.name for p in sorted(self.products, key=lambda p: (p.price, p.product_id), reverse=True)]
+        self.assertEqual(self.list_names(sort='-price'), expected)
+
+    def test_owner_and_created_window(self):
+        cutoff = timezone.now() - timedelta(days=1)
+        Products.objects.filter(pk=self.products[5].pk).update(created_at=cutoff - timedelta(days=1))
+        params = {'created_by': str(self.user.pk)}
+        self.assertEqual(set(self.list_names(created_after=cutoff.isoformat(), **params)), {'Product 1', 'Product 3'})
+        self.assertEqual(self.list_names(created_before=cutoff.isoformat(), **params), ['Product 5'])
+
+    def test_rejects_unknown_sort_and_bad_filters(self):
+        self.assertEqual(self.client.get('/products/products/', {'sort': 'quantity'}).status_code, 400)
+        self.assertEqual(self.client.get('/products/products/', {'min_price': 'cheap'}).status_code, 400)
+        self.assertEqual(self.client.get('/products/products/', {'min_price': 20, 'max_price': 10}).status_code, 400)
+
+    def test_cursor_from_other_sort_is_rejected(self):
+        cursor = self.client.get('/products/products/', {'page_size': 2}).json()['next'].split('cursor=')[1]
+        response = self.client.get('/products/products/', {'sort': 'price', 'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+    def test_facets_use_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/products/products/facets/', {'created_by': str(self.other.pk)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        facets = response.json()
+        self.assertEqual(facets['count'], 4)
+        self.assertEqual(facets['in_stock'], 2)
+        self.assertEqual(facets['out_of_stock'], 2)
+        self.assertEqual([bucket['count'] for bucket in facets['price']], [1, 0, 2, 0, 1])
+
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+    def test_filtered_sorts_use_indexes(self):
+        queries = {
+            'products_instock_price_idx': Products.objects.filter(quantity__gt=0, price__lte=50).order_by('price', 'product_id'),
+            'products_owner_created_idx': Products.objects.filter(created_by=self.user).order_by('-created_at', '-product_id'),
+            'products_price_id_idx': Products.objects.order_by('-price', '-product_id'),
+        }
+        for index, queryset in queries.items():
+            sql, params = queryset[:10].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+            self.assertIn(index, plan)
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+
+class ProductBulkImportExportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.existing = Products.objects.create(name='Widget', price=1, quantity=1, created_by=self.admin)
+
+    def upload(self, content, name='products.csv', **data):
+        upload = SimpleUploadedFile(name, content.encode('utf-8'))
+        return self.client.post('/products/products/import/', {'file': upload, **data}, format='multipart')
+
+    def test_csv_import_upserts_and_reports_bad_rows(self):
+        content = (
+            'name,description,quantity,price\n'
+            'Widget,Now in blue,7,2.50\n'
+            'Gadget,,3,9.99\n'
+            'Broken,,1,not-a-price\n'
+            ',,1,1.00\n'
+            'Gadget,Second row wins,4,9.99\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['failed']), (1, 1, 2))
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5])
+        self.assertIn('price', response.data['errors'][0]['errors'])
+
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.description, self.existing.quantity, str(self.existing.price)), ('Now in blue', 7, '2.50'))
+        gadget = Products.objects.get(name='Gadget')
+        self.assertEqual((gadget.quantity, gadget.created_by), (4, self.admin))
+
+    def test_ndjson_import_in_batches(self):
+        lines = [json.dumps({'name': f'Item {i}', 'price': '1.00', 'quantity': i}) for i in range(5)]
+        lines.insert(2, '{not json')
+        rows = bulk_services.parse_ndjson(io.StringIO('\n'.join(lines)))
+        with CaptureQueriesContext(connection) as queries:
+            report = bulk_services.import_products(rows, self.admin, batch_size=2)
+        self.assertEqual((report.created, report.failed), (5, 1))
+        self.assertEqual(report.errors[0]['line'], 3)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "products"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_import_keeps_search_index_in_sync(self):
+        self.upload('name,description,quantity,price\nWidget,Ergonomic walnut handle,1,1.00\n')
+        self.assertEqual([product.name for product in search_services.search_products('walnut', 10)], ['Widget'])
+
+    def test_import_requires_staff(self):
+        self.client.force_authenticate(user=User.objects.create_user(email='shopper@example.com', password='testpass123'))
+        self.assertEqual(self.upload('name,quantity,price\nGadget,1,1.00\n').status_code, 403)
+
+    def test_export_streams_and_round_trips(self):
+        Products.objects.create(name='Gadget, "deluxe"', price=3, quantity=2, created_by=self.admin)
+        response = self.client.get('/products/products/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual({row['name'] for row in rows}, {'Widget', 'Gadget, "deluxe"'})
+
+        report = bulk_services.import_products(bulk_services.parse_csv(io.StringIO(content)), self.admin)
+        self.assertEqual((report.created, report.updated, report.failed), (0, 2, 0))
+
+        response = self.client.get('/products/products/export/', {'file_format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(set(rows[0]), set(bulk_services.EXPORT_FIELDS))
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as handle:
+            handle.write('{"name": "Gizmo", "price": "4.00", "quantity": 2}\n')
+        self.addCleanup(os.unlink, handle.name)
+        out = io.StringIO()
+        call_command('import_products', handle.name, owner=self.admin.email, stdout=out)
+        self.assertIn('1 created', out.getvalue())
+        self.assertTrue(Products.objects.filter(name='Gizmo', created_by=self.admin).exists())
+
+
+class StockAdjustmentTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.products = [
+            Products.objects.create(name=f'Product {i}', price=1, quantity=10, created_by=self.admin) for i in range(3)
+        ]
+
+    def post(self, sequence, adjustments, feed='warehouse-1'):
+        return self.client.post(
+            '/products/inventory/adjustments/',
+            {'feed': feed, 'sequence': sequence, 'adjustments': adjustments},
+            format='json',
+        )
+
+    def quantities(self):
+        return [Products.objects.get(pk=product.pk).quantity for product in self.products]
+
+    def test_batch_applied_in_one_update_and_clamped(self):
+        first, second, third = (str(product.pk) for product in self.products)
+        unknown = str(uuid.uuid4())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(1, [
+                {'product_id': first, 'delta': 5},
+                {'product_id': second, 'delta': -25},
+                {'product_id': third, 'absolute': 3},
+                {'product_id': third, 'delta': 1},
+                {'product_id': unknown, 'delta': 1},
+            ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'applied': 3, 'unknown': [unknown], 'duplicate': False})
+        self.assertEqual(self.quantities(), [15, 0, 4])
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE "products"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_delta_after_absolute_is_clamped(self):
+        first, second = (str(product.pk) for product in self.products[:2])
+        response = self.post(1, [
+            {'product_id': first, 'absolute': 0},
+            {'product_id': first, 'delta': -5},
+            {'product_id': second, 'absolute': 2},
+            {'product_id': second, 'delta': -5},
+            {'product_id': second, 'delta': 4},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities()[:2], [0, 4])
+
+    def test_replayed_sequences_are_skipped(self):
+        adjustment = [{'product_id': str(self.products[0].pk), 'delta': -1}]
+        self.post(5, adjustment)
+        self.assertTrue(self.post(5, adjustment).data['duplicate'])
+        self.assertFalse(self.post(6, adjustment).data['duplicate'])
+        self.assertTrue(self.post(4, adjustment).data['duplicate'])
+        self.assertFalse(self.post(1, adjustment, feed='warehouse-2').data['duplicate'])
+        self.assertEqual(self.quantities()[0], 7)
+        self.assertEqual(InventoryFeedCursor.objects.get(feed='warehouse-1').last_sequence, 6)
+
+    def test_out_of_order_batch_is_rejected_until_the_gap_is_filled(self):
+        adjustment = [{'product_id': str(self.products[0].pk), 'delta': -1}]
+        self.post(1, adjustment)
+        response = self.post(3, adjustment)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['expected_sequence'], 2)
+        self.assertEqual(self.quantities()[0], 9)
+        self.assertFalse(self.post(2, adjustment).data['duplicate'])
+        self.assertFalse(self.post(3, adjustment).data['duplicate'])
+        self.assertEqual(self.quantities()[0], 7)
+
+    def test_invalidates_cached_product(self):
+        product = self.products[0]
+        self.client.get(f'/products/products/{product.pk}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(1, [{'product_id': str(product.pk), 'absolute': 42}])
+        self.assertEqual(self.client.get(f'/products/products/{product.pk}/').data['quantity'], 42)
+
+    def test_validation(self):
+        product_id = str(self.products[0].pk)
+        self.assertEqual(self.post(1, [{'product_id': product_id}]).status_code, 400)
+        self.assertEqual(self.post(1, [{'product_id': product_id, 'delta': 1, 'absolute': 1}]).status_code, 400)
+        self.assertEqual(self.post(1, [{'product_id': product_id, 'absolute': -1}]).status_code, 400)
+        self.assertEqual(self.post(1, []).status_code, 400)
+        self.assertFalse(InventoryFeedCursor.objects.exists())
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(user=User.objects.create_user(email='shopper@example.com', password='testpass123'))
+        self.assertEqual(self.post(1, [{'product_id': str(self.products[0].pk), 'delta': 1}]).status_code, 403)
+
+    def test_query_budget(self):
+        adjustments = [{'product_id': str(product.pk), 'delta': 1} for product in self.products]
+        for sequence in (1, 2):
+            response = self.assertWithinQueryBudget(
+                'post', '/products/inventory/adjustments/',
+                {'feed': 'warehouse-1', 'sequence': sequence, 'adjustments': adjustments}, format='json',
+            )
+            self.assertEqual(response.data['applied'], 3)
+
+
+class ProductConditionalRequestTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.product = Products.objects.create(name='Test Product', price=10, quantity=5, created_by=self.user)
+        self.url = f'/products/products/{self.product.pk}/'
+
+    def patch(self, data, **headers):
+        return self.client.patch(f'{self.url}update/', data, format='json', headers=headers)
+
+    def test_etag_gives_304_from_cache_without_queries(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': '"stale"'}).status_code, 200)
+
+    def test_async_view_shares_etags(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(f'/products/async/products/{self.product.pk}/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_patch_writes_only_changed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.assertWithinQueryBudget('patch', f'{self.url}update/', {'quantity': 9}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['quantity'], 9)
+        update = queries.captured_queries[-1]['sql']
+        self.assertTrue(update.startswith('UPDATE "products" SET "quantity" = 9, "updated_at" = '), update)
+        self.assertNotIn('"name"', update)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.quantity, self.product.name), (9, 'Test Product'))
+
+    def test_unchanged_patch_does_not_write(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.patch({'quantity': 5})
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_match_guards_updates(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.patch({'quantity': 7}, **{'If-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.patch({'quantity': 1}, **{'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 7)
+        self.assertEqual(self.client.get(self.url).data['quantity'], 7)
+
+    def test_change_after_if_match_check_is_not_overwritten(self):
+        etag = self.client.get(self.url)['ETag']
+
+        def concurrent_update(request, updated_at):
+            # Another request commits between the precondition check and the write.
+            Products.objects.filter(pk=self.product.pk).update(quantity=3, updated_at=timezone.now())
+            return conditional_response(request, updated_at)
+
+        with mock.patch('products.views.product_views.conditional_response', side_effect=concurrent_update):
+            response = self.patch({'quantity': 1}, **{'If-Match': etag})
+        self.assertEqual(response.status_code, 412)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 3)
+
+    def test_put_renaming_stays_within_budget(self):
+        data = {'name': 'Renamed Product', 'description': '', 'price': '10.00', 'quantity': 5}
+        response = self.assertWithinQueryBudget('put', f'{self.url}update/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_patch_other_users_product_forbidden(self):
+        self.client.force_authenticate(user=User.objects.create_user(email='other@example.com', password='testpass123'))
+        self.assertEqual(self.patch({'quantity': 1}).status_code, 403)
+        # Ownership is checked before the precondition.
+        self.assertEqual(self.patch({'quantity': 1}, **{'If-Match': '"stale"'}).status_code, 403)
+
+
+class SellerProductsTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.seller = User.objects.create_user(email='seller@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.seller)
+        self.mine = [
+            Products.objects.create(name=f'Mine {i}', price=1, quantity=i, created_by=self.seller) for i in range(30)
+        ]
+        self.theirs = Products.objects.create(name='Theirs', price=1, quantity=1, created_by=self.other)
+
+    def ids(self, products):
+        return [str(product.pk) for product in products]
+
+    def test_my_products_pages_only_own(self):
+        seen, url = [], '/products/products/mine/?page_size=12&fields=product_id,name'
+        while url:
+            response = self.assertWithinQueryBudget('get', url)
+            self.assertEqual(response.status_code, 200)
+            seen += response.data['results']
+            url = response.data['next']
+        self.assertEqual({product['product_id'] for product in seen}, set(self.ids(self.mine)))
+
+    def test_other_sellers_product_is_not_found(self):
+        url = f'/products/products/mine/{self.theirs.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.patch(url, {'quantity': 0}, format='json').status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertTrue(Products.objects.filter(pk=self.theirs.pk).exists())
+
+    def test_patch_and_delete_own_product(self):
+        product = self.mine[0]
+        url = f'/products/products/mine/{product.pk}/'
+        response = self.client.patch(url, {'price': '2.50'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+
+        cart = Cart.objects.create(user=self.other)
+        CartItem.objects.create(cart=cart, product=product, quantity=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Products.objects.filter(pk=product.pk).exists())
+        self.assertFalse(CartItem.objects.exists())
+        delete = next(query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE FROM "products"'))
+        self.assertIn('"created_by_id" =', delete)
+
+    def test_bulk_update_in_one_query(self):
+        ids = self.ids(self.mine[:20]) + [str(self.theirs.pk), str(uuid.uuid4())]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.assertWithinQueryBudget(
+                'post', '/products/products/mine/bulk-update/', {'product_ids': ids, 'quantity': 0, 'price': '3.00'}, format='json'
+            )
+        self.assertEqual(response.data, {'count': 20})
+        self.assertEqual(Products.objects.filter(created_by=self.seller, quantity=0, price=3).count(), 20)
+        self.theirs.refresh_from_db()
+        self.assertEqual(self.theirs.quantity, 1)
+        self.assertEqual(
+            self.client.post('/products/products/mine/bulk-update/', {'product_ids': ids}, format='json').status_code, 400
+        )
+
+    def test_bulk_delete_in_fixed_queries(self):
+        cart = Cart.objects.create(user=self.other)
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=product, quantity=1) for product in self.mine[:5]])
+        ids = self.ids(self.mine[:25]) + [str(self.theirs.pk)]
+        response = self.assertWithinQueryBudget('post', '/products/products/mine/bulk-delete/', {'product_ids': ids}, format='json')
+        self.assertEqual(response.data, {'count': 25})
+        self.assertEqual(Products.objects.count(), 6)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_bulk_delete_of_5000_products_keeps_its_query_count(self):
+        products = Products.objects.bulk_create(
+            [Products(name=f'Bulk {i}', price=1, quantity=1, created_by=self.seller) for i in range(5000)]
+        )
+        cart = Cart.objects.create(user=self.other)
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=product, quantity=1) for product in products[:1500]])
+        order = Order.objects.create(cart=cart)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, position=i, product=product, product_name=product.name, unit_price=1, quantity=1, line_total=1)
+            for i, product in enumerate(products[:1500])
+        ])
+        response = self.assertWithinQueryBudget(
+            'post', '/products/products/mine/bulk-delete/', {'product_ids': self.ids(products)}, format='json'
+        )
+        self.assertEqual(response.data, {'count': 5000})
+        self.assertFalse(CartItem.objects.exists())
+        self.assertEqual(OrderItem.objects.filter(product__isnull=True).count(), 1500)
+
+    def test_delete_handles_every_foreign_key_to_products(self):
+        # A new FK to Products must be handled by delete_products (and added
+        # to HANDLED_RELATIONS); until then the collector path is used.
+        self.assertEqual(seller_services.product_relations(), seller_services.HANDLED_RELATIONS)
+
+    def test_delete_falls_back_to_the_collector_when_signals_listen(self):
+        deleted = []
+
+        def listener(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(listener, sender=Products)
+        self.addCleanup(post_delete.disconnect, listener, sender=Products)
+        response = self.client.post('/products/products/mine/bulk-delete/', {'product_ids': self.ids(self.mine[:3])}, format='json')
+        self.assertEqual(response.data, {'count': 3})
+        self.assertEqual(set(deleted), {product.pk for product in self.mine[:3]})
@@ -4,11 +4,34 @@ from products.views.product_views import (
     ProductRetrieveView,
     ProductUpdateView,
     ProductDeleteView,
+    ProductFacetView,
 )
+from products.views.bulk_views import ProductExportView, ProductImportView
+from products.views.seller_views import (
+    MyProductBulkDeleteView,
+    MyProductBulkUpdateView,
+    MyProductDetailView,
+    MyProductListView,
+)
+from products.views.inventory_views import StockAdjustmentView
+from products.views.async_product_views import AsyncProductListView, AsyncProductRetrieveView
+from products.views.search_views import ProductAutocompleteView, ProductSearchView
 
 urlpatterns = [
     path('products/', ProductListCreateView.as_view(), name='product-list-create'),
+    path('products/facets/', ProductFacetView.as_view(), name='product-facets'),
+    path('products/search/', ProductSearchView.as_view(), name='product-search'),
+    path('products/autocomplete/', ProductAutocompleteView.as_view(), name='product-autocomplete'),
+    path('products/import/', ProductImportView.as_view(), name='product-import'),
+    path('products/export/', ProductExportView.as_view(), name='product-export'),
+    path('products/mine/', MyProductListView.as_view(), name='my-products'),
+    path('products/mine/bulk-delete/', MyProductBulkDeleteView.as_view(), name='my-products-bulk-delete'),
+    path('products/mine/bulk-update/', MyProductBulkUpdateView.as_view(), name='my-products-bulk-update'),
+    path('products/mine/<uuid:pk>/', MyProductDetailView.as_view(), name='my-product-detail'),
     path('products/<uuid:pk>/', ProductRetrieveView.as_view(), name='product-detail'),
     path('products/<uuid:pk>/update/', ProductUpdateView.as_view(), name='product-update'),
     path('products/<uuid:pk>/delete/', ProductDeleteView.as_view(), name='product-delete'),
+    path('inventory/adjustments/', StockAdjustmentView.as_view(), name='stock-adjustments'),
+    path('async/products/', AsyncProductListView.as_view(), name='product-list-async'),
+    path('async/products/<uuid:pk>/', AsyncProductRetrieveView.as_view(), name='product-detail-async'),
 ]
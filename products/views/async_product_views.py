@@ -0,0 +1,48 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from core.async_views import AsyncAPIView
+from core.conditional import conditional_response, set_validators
+from core.mixins import FieldProjectionMixin, KeysetSortMixin
+from core.pagination import KeysetPagination
+from products.filters.product_filters import PRODUCT_SORTS, ProductFilterBackend
+from products.models.product_models import Products
+from products.serializers.product_serializers import ProductSerializer
+from products.services import cache_services
+
+
+class AsyncProductListView(KeysetSortMixin, FieldProjectionMixin, AsyncAPIView):
+    """Async twin of ProductListCreateView's GET for ASGI deployments."""
+    serializer_class = ProductSerializer
+    sort_options = PRODUCT_SORTS
+    default_sort = '-created_at'
+    projection_required_fields = ('product_id', 'created_at')
+
+    async def get(self, request, *args, **kwargs):
+        async def load():
+            paginator = KeysetPagination()
+            queryset = ProductFilterBackend().filter_queryset(request, Products.objects.all(), self)
+            queryset = paginator.get_page_queryset(self.project_queryset(queryset), request, view=self)
+            page = paginator.build_page([product async for product in queryset])
+            serializer = ProductSerializer(page, many=True, fields=self.get_requested_fields())
+            return paginator.get_paginated_data(serializer.data)
+
+        payload = await cache_services.aget_list_payload(request.build_absolute_uri(), load)
+        return self.json_response(payload)
+
+
+class AsyncProductRetrieveView(AsyncAPIView):
+    """Async twin of ProductRetrieveView for ASGI deployments."""
+    serializer_class = ProductSerializer
+
+    async def get(self, request, pk, *args, **kwargs):
+        async def load():
+            try:
+                product = await Products.objects.aget(pk=pk)
+            except Products.DoesNotExist:
+                raise NotFound('No Products matches the given query.')
+            return ProductSerializer(product).data
+
+        payload = await cache_services.aget_product_payload(pk, load)
+        updated_at = parse_datetime(payload['updated_at'])
+        return conditional_response(request, updated_at) or set_validators(self.json_response(payload), updated_at)
@@ -0,0 +1,70 @@
+import io
+
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from products.services import bulk_services
+
+file_format_parameter = openapi.Parameter(
+    'file_format', openapi.IN_QUERY, description="`csv` (default) or `ndjson`",
+    type=openapi.TYPE_STRING, enum=list(bulk_services.FORMATS),
+)
+
+
+class ProductImportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser]
+    batch_size = 1000
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Create or update products in bulk from a CSV (header row) or NDJSON file, matched by name. "
+            "Invalid rows are skipped and reported by line number."
+        ),
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, description="CSV or NDJSON file", type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter(
+                'file_format', openapi.IN_FORM, description="Defaults to the file extension, else `csv`",
+                type=openapi.TYPE_STRING, enum=list(bulk_services.FORMATS),
+            ),
+        ],
+    )
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('file_format') or bulk_services.format_from_name(upload.name)
+        if file_format not in bulk_services.FORMATS:
+            return Response({'file_format': [f'Must be one of {", ".join(bulk_services.FORMATS)}.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Large uploads are spooled to disk by Django; this reads them line by line.
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        report = bulk_services.import_products(
+            bulk_services.PARSERS[file_format](lines), request.user, batch_size=self.batch_size
+        )
+        return Response(report.as_dict())
+
+
+class ProductExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Download every product as CSV or NDJSON, streamed row by row",
+        manual_parameters=[file_format_parameter],
+        responses={200: 'CSV or NDJSON file'},
+    )
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in bulk_services.FORMATS:
+            return Response({'file_format': [f'Must be one of {", ".join(bulk_services.FORMATS)}.']}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            bulk_services.export_products(file_format), content_type=bulk_services.CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{file_format}"'
+        return response
@@ -0,0 +1,31 @@
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from drf_yasg.utils import swagger_auto_schema
+
+from products.serializers.product_serializers import StockAdjustmentBatchSerializer, StockAdjustmentResultSerializer
+from products.services.inventory_services import SequenceGap, apply_stock_adjustments
+
+
+class StockAdjustmentView(generics.GenericAPIView):
+    serializer_class = StockAdjustmentBatchSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Apply a warehouse feed batch of stock changes, each a `delta` or an `absolute` quantity, in one update. "
+            "Quantities never go below zero. A batch whose `sequence` was already applied is skipped and reported "
+            "as `duplicate`; one that skips ahead of the feed's next sequence is rejected with 409 and "
+            "`expected_sequence`, so the feed can resend the missing batches first."
+        ),
+        request_body=StockAdjustmentBatchSerializer,
+        responses={200: StockAdjustmentResultSerializer, 409: 'Batch arrived before an earlier one.'}
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = apply_stock_adjustments(**serializer.validated_data)
+        except SequenceGap as exc:
+            return Response({'detail': str(exc), 'expected_sequence': exc.expected}, status=status.HTTP_409_CONFLICT)
+        return Response(StockAdjustmentResultSerializer(result).data)
@@ -1,24 +1,70 @@
+from django.utils.dateparse import parse_datetime
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
 
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+from core.conditional import conditional_response, has_write_precondition, set_validators
+from core.mixins import FieldProjectionMixin, KeysetSortMixin
+from core.pagination import KeysetPagination
+from products.filters.product_filters import PRODUCT_SORTS, ProductFilterBackend, swagger_filter_parameters
 from products.models.product_models import Products
 from products.serializers.product_serializers import ProductSerializer
+from products.services import cache_services
+from products.services.facet_services import product_facets
 
+if_none_match_parameter = openapi.Parameter(
+    'If-None-Match', openapi.IN_HEADER, type=openapi.TYPE_STRING, description="ETag from an earlier response"
+)
+if_match_parameter = openapi.Parameter(
+    'If-Match', openapi.IN_HEADER, type=openapi.TYPE_STRING,
+    description="ETag from an earlier response; the update fails with 412 if the product changed since",
+)
 
-class ProductListCreateView(generics.ListCreateAPIView):
+
+class ProductListCreateView(KeysetSortMixin, FieldProjectionMixin, generics.ListCreateAPIView):
     queryset = Products.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    filter_backends = [ProductFilterBackend]
+    sort_options = PRODUCT_SORTS
+    default_sort = '-created_at'
+    projection_required_fields = ('product_id', 'created_at')
 
     @swagger_auto_schema(
-        operation_description="List all products",
+        operation_description="List products, newest first unless `sort` says otherwise, one cursor page at a time",
+        manual_parameters=swagger_filter_parameters + [
+            openapi.Parameter(
+                'sort', openapi.IN_QUERY, description="Sort order", type=openapi.TYPE_STRING, enum=list(PRODUCT_SORTS)
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, description="Opaque cursor taken from the previous page's `next` link", type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY, description="Number of products per page", type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'fields', openapi.IN_QUERY, description="Comma-separated product fields to return, e.g. `product_id,name,price`", type=openapi.TYPE_STRING
+            ),
+        ],
         responses={200: ProductSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def get_queryset(self):
+        return self.project_queryset(super().get_queryset())
+
+    def list(self, request, *args, **kwargs):
+        payload = cache_services.get_list_payload(
+            request.build_absolute_uri(),
+            lambda: super(ProductListCreateView, self).list(request, *args, **kwargs).data,
+        )
+        return Response(payload)
+
     @swagger_auto_schema(
         operation_description="Create a new product",
         request_body=ProductSerializer,
@@ -29,6 +75,19 @@ class ProductListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
+        cache_services.invalidate_products()
+
+class ProductFacetView(generics.GenericAPIView):
+    queryset = Products.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [ProductFilterBackend]
+
+    @swagger_auto_schema(
+        operation_description="Count matching products by price bucket and stock state. Takes the same filters as the product list.",
+        manual_parameters=swagger_filter_parameters,
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(product_facets(self.filter_queryset(self.get_queryset())))
 
 class ProductRetrieveView(generics.RetrieveAPIView):
     queryset = Products.objects.all()
@@ -36,30 +95,80 @@ class ProductRetrieveView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
-        operation_description="Get a specific product",
-        responses={200: ProductSerializer}
+        operation_description="Get a specific product. Send the `ETag` back as `If-None-Match` to get 304 if it has not changed.",
+        manual_parameters=[if_none_match_parameter],
+        responses={200: ProductSerializer, 304: 'Not Modified'}
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-class ProductUpdateView(generics.UpdateAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        payload = cache_services.get_product_payload(
+            kwargs['pk'],
+            lambda: super(ProductRetrieveView, self).retrieve(request, *args, **kwargs).data,
+        )
+        # Validators come from the cached payload, so a 304 needs no query.
+        updated_at = parse_datetime(payload['updated_at'])
+        return conditional_response(request, updated_at) or set_validators(Response(payload), updated_at)
+
+class ConditionalUpdateMixin:
+    """
+    UpdateModelMixin.update that honours If-Match / If-Unmodified-Since
+    against the product's `updated_at` and returns the new ETag. Write
+    permission is checked before the precondition, and a conditional write
+    only applies if `updated_at` still matches when the row is written, so
+    a concurrent update yields 412 rather than being lost.
+    """
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        self.check_write_permission(instance)
+        precondition_failed = conditional_response(request, instance.updated_at)
+        if precondition_failed is not None:
+            return precondition_failed
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        if has_write_precondition(request):
+            serializer.context['expected_updated_at'] = instance.updated_at
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return set_validators(Response(serializer.data), serializer.instance.updated_at)
+
+    def check_write_permission(self, instance):
+        pass
+
+
+class ProductUpdateView(ConditionalUpdateMixin, generics.UpdateAPIView):
     queryset = Products.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
         operation_description="Update your own product",
+        manual_parameters=[if_match_parameter],
         request_body=ProductSerializer,
-        responses={200: ProductSerializer}
+        responses={200: ProductSerializer, 412: 'Precondition Failed'}
     )
     def put(self, request, *args, **kwargs):
         return super().put(request, *args, **kwargs)
 
-    def perform_update(self, serializer):
-        product = self.get_object()
-        if product.created_by != self.request.user:
+    @swagger_auto_schema(
+        operation_description="Change some fields of your own product; only changed columns are written",
+        manual_parameters=[if_match_parameter],
+        request_body=ProductSerializer,
+        responses={200: ProductSerializer, 412: 'Precondition Failed'}
+    )
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+    def check_write_permission(self, instance):
+        if instance.created_by_id != self.request.user.pk:
             raise PermissionDenied("You can only update your own products.")
+
+    def perform_update(self, serializer):
+        self.check_write_permission(serializer.instance)
         serializer.save()
+        cache_services.invalidate_products([serializer.instance.pk])
 
 class ProductDeleteView(generics.DestroyAPIView):
     queryset = Products.objects.all()
@@ -74,6 +183,8 @@ class ProductDeleteView(generics.DestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
     def perform_destroy(self, instance):
-        if instance.created_by != self.request.user:
+        if instance.created_by_id != self.request.user.pk:
             raise PermissionDenied("You can only delete your own products.")
+        product_id = instance.pk
         instance.delete()
+        cache_services.invalidate_products([product_id])
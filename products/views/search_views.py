@@ -0,0 +1,70 @@
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from core.mixins import FieldProjectionMixin
+from products.serializers.product_serializers import ProductSerializer, ProductSuggestionSerializer
+from products.services import search_services
+
+
+def _bounded_int(request, name, default, maximum):
+    try:
+        value = int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+    return min(max(value, 0), maximum)
+
+
+class ProductSearchView(FieldProjectionMixin, generics.GenericAPIView):
+    serializer_class = ProductSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+    # Ranked results are paged by offset; cap it so deep pages stay cheap.
+    max_offset = 1000
+
+    @swagger_auto_schema(
+        operation_description="Search products by name and description, best matches first. The last word matches as a prefix.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search text", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of products per page", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('offset', openapi.IN_QUERY, description="Taken from the previous page's `next` link", type=openapi.TYPE_INTEGER),
+            openapi.Parameter(
+                'fields', openapi.IN_QUERY, description="Comma-separated product fields to return, e.g. `product_id,name,price`", type=openapi.TYPE_STRING
+            ),
+        ],
+        responses={200: ProductSerializer(many=True)}
+    )
+    def get(self, request, *args, **kwargs):
+        page_size = _bounded_int(request, 'page_size', self.page_size, self.max_page_size) or self.page_size
+        offset = _bounded_int(request, 'offset', 0, self.max_offset)
+        rows = search_services.search_products(request.query_params.get('q', ''), page_size + 1, offset)
+
+        next_link = None
+        if len(rows) > page_size and offset + page_size <= self.max_offset:
+            next_link = replace_query_param(request.build_absolute_uri(), 'offset', offset + page_size)
+        serializer = self.get_serializer(rows[:page_size], many=True)
+        return Response({'next': next_link, 'results': serializer.data})
+
+
+class ProductAutocompleteView(generics.GenericAPIView):
+    serializer_class = ProductSuggestionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    limit = 10
+    max_limit = 25
+
+    @swagger_auto_schema(
+        operation_description="Suggest product names for partially typed text",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Text typed so far", type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Maximum number of suggestions", type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: ProductSuggestionSerializer(many=True)}
+    )
+    def get(self, request, *args, **kwargs):
+        limit = _bounded_int(request, 'limit', self.limit, self.max_limit) or self.limit
+        suggestions = search_services.autocomplete(request.query_params.get('q', ''), limit)
+        return Response(self.get_serializer(suggestions, many=True).data)
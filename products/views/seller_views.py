@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+
+from core.mixins import FieldProjectionMixin, KeysetSortMixin
+from core.pagination import KeysetPagination
+from products.filters.product_filters import PRODUCT_SORTS, ProductFilterBackend, swagger_filter_parameters
+from products.models.product_models import Products
+from products.serializers.product_serializers import (
+    ProductBulkResultSerializer,
+    ProductBulkUpdateSerializer,
+    ProductIdListSerializer,
+    ProductSerializer,
+)
+from products.services import cache_services
+from products.services.seller_services import delete_products
+from products.views.product_views import ConditionalUpdateMixin, if_match_parameter
+
+
+class SellerProductsMixin:
+    """
+    Scopes the queryset to the requesting seller's products, so ownership is
+    part of every query's WHERE clause and other sellers' products are 404.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Products.objects.filter(created_by_id=self.request.user.pk)
+
+
+class MyProductListView(SellerProductsMixin, KeysetSortMixin, FieldProjectionMixin, generics.ListAPIView):
+    serializer_class = ProductSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [ProductFilterBackend]
+    sort_options = PRODUCT_SORTS
+    default_sort = '-created_at'
+    projection_required_fields = ('product_id', 'created_at')
+
+    @swagger_auto_schema(
+        operation_description="List your own products, newest first unless `sort` says otherwise, one cursor page at a time",
+        manual_parameters=swagger_filter_parameters + [
+            openapi.Parameter(
+                'sort', openapi.IN_QUERY, description="Sort order", type=openapi.TYPE_STRING, enum=list(PRODUCT_SORTS)
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, description="Opaque cursor taken from the previous page's `next` link", type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'page_size', openapi.IN_QUERY, description="Number of products per page", type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'fields', openapi.IN_QUERY, description="Comma-separated product fields to return, e.g. `product_id,name,price`", type=openapi.TYPE_STRING
+            ),
+        ],
+        responses={200: ProductSerializer(many=True)}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return self.project_queryset(super().get_queryset())
+
+
+class MyProductDetailView(SellerProductsMixin, ConditionalUpdateMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = ProductSerializer
+
+    @swagger_auto_schema(operation_description="Get one of your products", responses={200: ProductSerializer})
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="Update one of your products",
+        manual_parameters=[if_match_parameter],
+        request_body=ProductSerializer,
+        responses={200: ProductSerializer, 412: 'Precondition Failed'}
+    )
+    def put(self, request, *args, **kwargs):
+        return super().put(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="Change some fields of one of your products; only changed columns are written",
+        manual_parameters=[if_match_parameter],
+        request_body=ProductSerializer,
+        responses={200: ProductSerializer, 412: 'Precondition Failed'}
+    )
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+    @swagger_auto_schema(operation_description="Delete one of your products", responses={204: 'No Content'})
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        cache_services.invalidate_products([serializer.instance.pk])
+
+    def destroy(self, request, *args, **kwargs):
+        # Delete straight from the owner-scoped queryset; no fetch-then-check.
+        with transaction.atomic():
+            deleted = delete_products(self.get_queryset().filter(pk=kwargs['pk']))
+        if not deleted:
+            raise NotFound('No Products matches the given query.')
+        cache_services.invalidate_products([kwargs['pk']])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MyProductBulkDeleteView(SellerProductsMixin, generics.GenericAPIView):
+    serializer_class = ProductIdListSerializer
+
+    @swagger_auto_schema(
+        operation_description="Delete up to 5000 of your products by id. Ids of other sellers' products are ignored.",
+        request_body=ProductIdListSerializer,
+        responses={200: ProductBulkResultSerializer}
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_ids = serializer.validated_data['product_ids']
+        with transaction.atomic():
+            deleted = delete_products(self.get_queryset().filter(pk__in=product_ids))
+            cache_services.invalidate_products(product_ids)
+        return Response({'count': deleted})
+
+
+class MyProductBulkUpdateView(SellerProductsMixin, generics.GenericAPIView):
+    serializer_class = ProductBulkUpdateSerializer
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Set description, quantity and/or price on up to 5000 of your products by id in one update. "
+            "Ids of other sellers' products are ignored."
+        ),
+        request_body=ProductBulkUpdateSerializer,
+        responses={200: ProductBulkResultSerializer}
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        product_ids = changes.pop('product_ids')
+        with transaction.atomic():
+            updated = self.get_queryset().filter(pk__in=product_ids).update(**changes, updated_at=timezone.now())
+            cache_services.invalidate_products(product_ids)
+        return Response({'count': updated})